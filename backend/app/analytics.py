@@ -0,0 +1,168 @@
+# app/analytics.py
+"""Análise do fluxo de caixa de um CA: burn rate, variação mensal e projeção.
+
+Os lançamentos são somados por dia no MySQL (uma linha por dia com
+movimento) e o resto é calculado de forma vetorizada com NumPy sobre a
+série diária: janelas móveis de 30/90 dias por soma acumulada, totais
+mensais por `bincount` e uma regressão linear do saldo para estimar quando
+ele fica negativo.
+
+O resultado fica em cache por CA até o próximo lançamento. A validade é
+conferida pelo maior id de transação e de auditoria do CA (leituras de
+índice), então vale também para lançamentos, alterações e exclusões
+gravados por outros workers.
+"""
+import math
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.config import settings
+from app.ledger import marcador_lancamentos, saldo_atual
+from app.models.sql_models import TipoTransacao, Transacao, TransacaoArquivada
+
+JANELAS = (30, 90)
+# Dias de saldo usados no ajuste linear da projeção
+JANELA_PROJECAO = 90
+
+# ca_id -> (marcador, resultado)
+analytics_cache = TTLCache(maxsize=settings.ANALYTICS_CACHE_MAX_SIZE)
+
+def invalidar_analise(centro_academico_id: int) -> None:
+    analytics_cache.pop(centro_academico_id)
+
+async def _marcador(db: AsyncSession, centro_academico_id: int, hoje: date) -> tuple:
+    # As janelas são relativas a hoje: o dia também faz parte da validade
+    return (*await marcador_lancamentos(db, centro_academico_id), hoje)
+
+async def _serie_diaria(db: AsyncSession, centro_academico_id: int, hoje: date):
+    """(dias, receitas, despesas) como arrays, um elemento por dia com movimento."""
+    rows = []
+    # Anos arquivados (todos anteriores ao corte) e depois a tabela corrente
+    for modelo in (TransacaoArquivada, Transacao):
+        dia = func.date(modelo.data).label("dia")
+        receita = func.coalesce(func.sum(case((modelo.tipo == TipoTransacao.Receita, modelo.valor), else_=0)), 0)
+        despesa = func.coalesce(func.sum(case((modelo.tipo == TipoTransacao.Despesa, modelo.valor), else_=0)), 0)
+        result = await db.execute(
+            select(dia, receita.label("receitas"), despesa.label("despesas"))
+            .where(
+                modelo.centro_academico_id == centro_academico_id,
+                modelo.data < datetime.combine(hoje + timedelta(days=1), datetime.min.time()),
+            )
+            .group_by(dia)
+            .order_by(dia)
+        )
+        rows += result.all()
+    dias = np.array([r.dia for r in rows], dtype="datetime64[D]")
+    receitas = np.array([float(r.receitas) for r in rows], dtype=np.float64)
+    despesas = np.array([float(r.despesas) for r in rows], dtype=np.float64)
+    return dias, receitas, despesas
+
+def _media_movel(acumulado: np.ndarray, janela: int) -> np.ndarray:
+    """Média por dia das últimas `janela` posições, a partir da soma acumulada (com 0 inicial)."""
+    return (acumulado[janela:] - acumulado[:-janela]) / janela
+
+def calcular_fluxo(dias: np.ndarray, receitas: np.ndarray, despesas: np.ndarray, saldo: float, hoje: date) -> dict:
+    """Métricas de fluxo de caixa a partir da série diária (função pura, sem banco)."""
+    hoje_d = np.datetime64(hoje, "D")
+    resultado = {
+        "saldo_atual": saldo,
+        "meses": [],
+        "serie": [],
+        "projecao": {
+            "tendencia_diaria": 0.0,
+            "janela_dias": JANELA_PROJECAO,
+            "dias_ate_negativo": 0 if saldo < 0 else None,
+            "data_saldo_negativo": hoje.isoformat() if saldo < 0 else None,
+        },
+    }
+    for janela in JANELAS:
+        resultado[f"burn_rate_{janela}d"] = 0.0
+        resultado[f"fluxo_medio_{janela}d"] = 0.0
+    if dias.size == 0:
+        return resultado
+
+    # Série diária contínua (dias sem movimento = 0), longa o bastante para
+    # JANELA_PROJECAO médias móveis completas da maior janela
+    inicio = min(dias[0], hoje_d - (max(JANELAS) + JANELA_PROJECAO - 2))
+    n = int((hoje_d - inicio).astype(int)) + 1
+    posicoes = (dias - inicio).astype(int)
+    receita_dia = np.zeros(n)
+    despesa_dia = np.zeros(n)
+    receita_dia[posicoes] = receitas
+    despesa_dia[posicoes] = despesas
+    liquido_dia = receita_dia - despesa_dia
+
+    acum_despesa = np.concatenate(([0.0], np.cumsum(despesa_dia)))
+    acum_liquido = np.concatenate(([0.0], np.cumsum(liquido_dia)))
+
+    # Janelas móveis: valor atual e série dos últimos JANELA_PROJECAO dias
+    moveis = {}
+    for janela in JANELAS:
+        burn = _media_movel(acum_despesa, janela)
+        fluxo = _media_movel(acum_liquido, janela)
+        resultado[f"burn_rate_{janela}d"] = round(float(burn[-1]), 2)
+        resultado[f"fluxo_medio_{janela}d"] = round(float(fluxo[-1]), 2)
+        moveis[janela] = burn[-JANELA_PROJECAO:]
+    datas_serie = np.arange(hoje_d - (JANELA_PROJECAO - 1), hoje_d + 1)
+    resultado["serie"] = [
+        {"dia": str(d), **{f"burn_{j}d": round(float(moveis[j][i]), 2) for j in JANELAS}}
+        for i, d in enumerate(datas_serie)
+    ]
+
+    # Totais mensais (só a partir do primeiro lançamento) e variação mês a mês
+    primeiro_mes = dias[0].astype("datetime64[M]")
+    n_meses = int((hoje_d.astype("datetime64[M]") - primeiro_mes).astype(int)) + 1
+    indice_mes = (dias.astype("datetime64[M]") - primeiro_mes).astype(int)
+    receita_mes = np.bincount(indice_mes, weights=receitas, minlength=n_meses)
+    despesa_mes = np.bincount(indice_mes, weights=despesas, minlength=n_meses)
+    liquido_mes = receita_mes - despesa_mes
+    variacao = np.diff(liquido_mes, prepend=np.nan)
+    anterior = np.concatenate(([np.nan], liquido_mes[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentual = np.where(anterior != 0, variacao / np.abs(anterior) * 100, np.nan)
+    meses = np.arange(primeiro_mes, primeiro_mes + n_meses)
+    resultado["meses"] = [
+        {
+            "mes": str(meses[i]),
+            "receitas": round(float(receita_mes[i]), 2),
+            "despesas": round(float(despesa_mes[i]), 2),
+            "liquido": round(float(liquido_mes[i]), 2),
+            "variacao": None if np.isnan(variacao[i]) else round(float(variacao[i]), 2),
+            "variacao_percentual": None if np.isnan(percentual[i]) else round(float(percentual[i]), 1),
+        }
+        for i in range(n_meses)
+    ]
+
+    # Saldo ao fim de cada dia (reconstruído para trás a partir do saldo atual)
+    saldo_dia = saldo - (acum_liquido[-1] - acum_liquido[1:])
+    y = saldo_dia[-JANELA_PROJECAO:]
+    x = np.arange(-(y.size - 1), 1, dtype=np.float64)
+    tendencia = float(np.polyfit(x, y, 1)[0]) if np.ptp(y) > 0 else 0.0
+    resultado["projecao"]["tendencia_diaria"] = round(tendencia, 2)
+    if saldo >= 0 and tendencia < 0:
+        dias_ate = math.ceil(saldo / -tendencia) if saldo > 0 else 0
+        resultado["projecao"]["dias_ate_negativo"] = dias_ate
+        resultado["projecao"]["data_saldo_negativo"] = (hoje + timedelta(days=dias_ate)).isoformat()
+    return resultado
+
+async def analisar_fluxo(db: AsyncSession, centro_academico_id: int, hoje: Optional[date] = None) -> Optional[dict]:
+    """Análise do CA (em cache até o próximo lançamento). None se o CA não existir."""
+    hoje = hoje or date.today()
+    marcador = await _marcador(db, centro_academico_id, hoje)
+    cached = analytics_cache.get(centro_academico_id)
+    if cached is not None and cached[0] == marcador:
+        return cached[1]
+
+    saldo = await saldo_atual(db, centro_academico_id)
+    if saldo is None:
+        return None
+    dias, receitas, despesas = await _serie_diaria(db, centro_academico_id, hoje)
+    resultado = calcular_fluxo(dias, receitas, despesas, float(saldo["saldo"]), hoje)
+    resultado["gerado_em"] = datetime.now().isoformat()
+    analytics_cache.set(centro_academico_id, (marcador, resultado))
+    return resultado
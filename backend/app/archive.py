@@ -0,0 +1,166 @@
+# app/archive.py
+"""Arquivamento dos anos fiscais fechados do livro-caixa.
+
+Particionar `transacoes` por RANGE(data) não é possível neste schema: no
+InnoDB uma tabela particionada não aceita chaves estrangeiras (nem ser alvo
+delas) e a coluna de partição teria de fazer parte da chave primária. Em vez
+disso, os anos fechados de cada CA são movidos para `transacoes_arquivo`
+(mesmas colunas, mesmo id) e a data de corte fica em `transacoes_corte`.
+
+As consultas escolhem a tabela pelo período (`fonte_periodo`): tudo a partir
+do corte lê só `transacoes`; períodos anteriores leem o arquivo ou a união
+das duas. Lançamentos com data anterior ao corte são recusados, então as
+duas tabelas nunca se sobrepõem no tempo.
+
+Uso (na pasta backend):
+    python -m app.archive arquivar --ano 2023 [--ca ID]
+    python -m app.archive status
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, datetime, time
+from typing import Dict, Optional
+
+from sqlalchemy import delete, func, insert, select, union_all
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.sql_models import CentroAcademico, CorteArquivo, SaldoSnapshot, Transacao, TransacaoArquivada
+
+logger = logging.getLogger(__name__)
+
+COLUNAS = ("id", "descricao", "valor", "tipo", "data", "usuario_id", "centro_academico_id")
+
+async def obter_corte(db: AsyncSession, centro_academico_id: int) -> Optional[date]:
+    """Data de corte do CA (transações anteriores estão arquivadas), ou None."""
+    result = await db.execute(
+        select(CorteArquivo.corte).where(CorteArquivo.centro_academico_id == centro_academico_id)
+    )
+    return result.scalar()
+
+def inicio_do_corte(corte: date) -> datetime:
+    return datetime.combine(corte, time.min)
+
+def transacoes_todas(centro_academico_id: int):
+    """`transacoes` + `transacoes_arquivo` do CA, consultável como `Transacao`."""
+    partes = [
+        select(*(modelo.__table__.c[c] for c in COLUNAS)).where(modelo.centro_academico_id == centro_academico_id)
+        for modelo in (Transacao, TransacaoArquivada)
+    ]
+    return aliased(Transacao, union_all(*partes).subquery("transacoes_todas"))
+
+def modelos_periodo(corte: Optional[date], inicio: Optional[datetime] = None, fim: Optional[datetime] = None) -> list:
+    """Tabelas com transações em `inicio <= data < fim`, da mais antiga para a mais recente."""
+    if corte is None:
+        return [Transacao]
+    limite = inicio_do_corte(corte)
+    if inicio is not None and inicio >= limite:
+        return [Transacao]
+    if fim is not None and fim <= limite:
+        return [TransacaoArquivada]
+    return [TransacaoArquivada, Transacao]
+
+def fonte_periodo(
+    centro_academico_id: int,
+    corte: Optional[date],
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+):
+    """Entidade a consultar para as transações do CA com `inicio <= data < fim`."""
+    modelos = modelos_periodo(corte, inicio, fim)
+    return modelos[0] if len(modelos) == 1 else transacoes_todas(centro_academico_id)
+
+# --- ARQUIVAMENTO ---
+async def arquivar(ano: int, centro_academico_id: Optional[int] = None) -> Dict[int, int]:
+    """Move as transações até 31/12 de `ano` para o arquivo e avança o corte.
+
+    Cada CA é movido numa única transação (INSERT ... SELECT, DELETE e o novo
+    corte), então as consultas nunca veem o ano pela metade. Retorna
+    `{ca_id: transações movidas}`.
+    """
+    from app.ledger import MODO_APPEND_ONLY
+
+    if ano >= date.today().year:
+        raise ValueError("Só anos fiscais já encerrados podem ser arquivados.")
+    novo_corte = date(ano + 1, 1, 1)
+    limite = inicio_do_corte(novo_corte)
+    movidas = {}
+
+    async with AsyncSessionLocal() as db:
+        if centro_academico_id is not None:
+            ca_ids = [centro_academico_id]
+        else:
+            ca_ids = (await db.execute(select(CentroAcademico.id))).scalars().all()
+        await db.rollback()
+
+        for ca_id in ca_ids:
+            corte = await obter_corte(db, ca_id)
+            if corte is not None and corte >= novo_corte:
+                await db.rollback()
+                continue
+            filtros = [Transacao.centro_academico_id == ca_id, Transacao.data < limite]
+
+            if settings.LEDGER_MODE == MODO_APPEND_ONLY:
+                # O saldo derivado soma os ids posteriores à fotografia: ela
+                # precisa cobrir tudo o que sai de `transacoes`
+                maior_id = (await db.execute(select(func.max(Transacao.id)).where(*filtros))).scalar()
+                coberto = (await db.execute(
+                    select(func.max(SaldoSnapshot.ultima_transacao_id)).where(SaldoSnapshot.centro_academico_id == ca_id)
+                )).scalar()
+                if maior_id and (coberto or 0) < maior_id:
+                    await db.rollback()
+                    logger.warning("CA %s não arquivado: rode `python -m app.ledger snapshot` antes.", ca_id)
+                    continue
+
+            result = await db.execute(
+                insert(TransacaoArquivada).from_select(
+                    list(COLUNAS), select(*(Transacao.__table__.c[c] for c in COLUNAS)).where(*filtros)
+                )
+            )
+            await db.execute(delete(Transacao).where(*filtros).execution_options(synchronize_session=False))
+            upsert = mysql_insert(CorteArquivo).values(centro_academico_id=ca_id, corte=novo_corte)
+            await db.execute(upsert.on_duplicate_key_update(corte=upsert.inserted.corte, atualizado_em=func.now()))
+            await db.commit()
+            movidas[ca_id] = result.rowcount
+            logger.info("CA %s: %s transações arquivadas (corte %s)", ca_id, result.rowcount, novo_corte)
+    return movidas
+
+async def _main() -> None:
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Arquivamento de anos fiscais fechados")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    arq = sub.add_parser("arquivar", help="move as transações até o fim do ano para transacoes_arquivo")
+    arq.add_argument("--ano", type=int, required=True, help="último ano fiscal a arquivar")
+    arq.add_argument("--ca", type=int, default=None, help="apenas este centro acadêmico")
+    sub.add_parser("status", help="corte e volume arquivado de cada CA")
+    args = parser.parse_args()
+
+    if args.comando == "arquivar":
+        try:
+            movidas = await arquivar(args.ano, args.ca)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        for ca_id, quantidade in movidas.items():
+            print(f"CA {ca_id}: {quantidade} transações arquivadas")
+    else:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(CorteArquivo.centro_academico_id, CorteArquivo.corte, func.count(TransacaoArquivada.id))
+                .outerjoin(TransacaoArquivada, TransacaoArquivada.centro_academico_id == CorteArquivo.centro_academico_id)
+                .group_by(CorteArquivo.centro_academico_id, CorteArquivo.corte)
+            )
+            linhas = result.all()
+        for ca_id, corte, quantidade in linhas:
+            print(f"CA {ca_id}: corte {corte.isoformat()}, {quantidade} transações arquivadas")
+        if not linhas:
+            print("Nenhum ano arquivado.")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -20,14 +20,68 @@ class Settings(BaseSettings):
             f"@{values.get('DB_HOST')}:{values.get('DB_PORT')}/{values.get('DB_NAME')}"
         )
 
+    # Pool de conexões do SQLAlchemy
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
     # --- Configurações do MongoDB ---
     MONGO_URL: str = "mongodb://localhost:27017"
     MONGO_DB_NAME: str = "sgca"
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
 
     # --- Configurações de Segurança ---
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # Assina cargo/CA/departamento no token para rotas que dispensam o SELECT do usuário
+    JWT_CLAIMS_MODE: bool = False
+    TOKEN_VERSION_REFRESH_SECONDS: int = 30
+
+    # --- Cache de usuários autenticados (get_current_user) ---
+    # TTL em segundos; 0 desativa o cache
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 2048
+
+    # --- Livro-caixa ---
+    # "saldo": cada lançamento atualiza centro_academico.saldo (linha disputada)
+    # "append_only": lançamentos só inserem; o saldo vem da última fotografia
+    # (saldo_snapshots) + deltas, e um compactador grava novas fotografias
+    LEDGER_MODE: str = "saldo"
+    LEDGER_SNAPSHOT_INTERVAL_SECONDS: int = 60
+    # Espera entre ler o maior id e somar: cobre transações ainda não commitadas
+    LEDGER_SNAPSHOT_GRACE_SECONDS: float = 5.0
+    LEDGER_SNAPSHOTS_KEPT: int = 10
+    # Conciliação: lançamentos somados por consulta (keyset por id)
+    LEDGER_RECONCILE_CHUNK_SIZE: int = 5000
+
+    # --- Cache de relatórios financeiros ---
+    # Conferido a cada leitura contra o maior id de transação/auditoria do CA,
+    # então vale entre workers; o TTL só limita a memória (0 = sem expiração).
+    REPORT_CACHE_TTL_SECONDS: int = 0
+    REPORT_CACHE_MAX_SIZE: int = 512
+    # Análise de fluxo de caixa (uma entrada por CA, válida até o próximo lançamento)
+    ANALYTICS_CACHE_MAX_SIZE: int = 256
+
+    # --- Pool de hashing de senhas (bcrypt fora do event loop) ---
+    # "thread" ou "process"; acima de WORKERS + MAX_QUEUE chamadas simultâneas responde 503
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    # Cadastro de membros em lote: pool de processos próprio, para não
+    # disputar (nem saturar) o pool usado pelos logins
+    ONBOARDING_HASH_WORKERS: int = 4
+    ONBOARDING_MAX_ROWS: int = 1000
+
+    # --- Busca de membros (/membros/search) ---
+    # Índice em memória por CA, refeito após cadastros/alterações no próprio
+    # processo. Com vários workers, o TTL limita a defasagem entre eles.
+    MEMBER_SEARCH_TTL_SECONDS: int = 300
+    MEMBER_SEARCH_CACHE_MAX_SIZE: int = 256
 
     model_config = SettingsConfigDict(env_file=".env", extra="allow")
 
@@ -1,10 +1,61 @@
+import threading
+import time
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 from app.config import settings
 
+# --- Pool MySQL instrumentado ---
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool que mede quanto tempo cada checkout esperou por uma conexão."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.wait_count,
+            "wait_avg_ms": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "timeouts": self.timeouts,
+        }
+
 # Configuração MySQL (SQLAlchemy)
-engine = create_async_engine(settings.DATABASE_URL, echo=False)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=False,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
@@ -12,9 +63,99 @@ async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
+# --- Pool MongoDB monitorado ---
+class MongoPoolStats(monitoring.ConnectionPoolListener):
+    """Contadores do pool do Motor a partir dos eventos de CMAP do PyMongo.
+
+    O Motor executa cada operação do PyMongo numa thread; o início e o fim do
+    checkout da mesma operação acontecem na mesma thread, o que permite medir
+    a espera sem depender da duração nos eventos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = {}
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _finish_wait(self):
+        start = self._started.pop(threading.get_ident(), None)
+        self.waiting = max(0, self.waiting - 1)
+        if start is not None:
+            waited = time.perf_counter() - start
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self._started[threading.get_ident()] = time.perf_counter()
+            self.waiting += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self._finish_wait()
+            self.checked_out += 1
+            self.checkouts += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._finish_wait()
+            self.failed += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.timeouts += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open = max(0, self.open - 1)
+
+    # Eventos sem contador associado
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+                "min_pool_size": settings.MONGO_MIN_POOL_SIZE,
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "idle": max(0, self.open - self.checked_out),
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+            }
+
+mongo_pool_stats = MongoPoolStats()
+
 # Configuração MongoDB (Motor)
-mongo_client = AsyncIOMotorClient(settings.MONGO_URL)
+mongo_client = AsyncIOMotorClient(
+    settings.MONGO_URL,
+    maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+    minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+    waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    event_listeners=[mongo_pool_stats],
+)
 mongo_db = mongo_client[settings.MONGO_DB_NAME]
 
 async def get_mongo_db():
-    return mongo_db
\ No newline at end of file
+    return mongo_db
@@ -0,0 +1,164 @@
+# app/event_tasks.py
+"""Tarefas dos eventos na coleção própria `tarefas`.
+
+Cada tarefa é um documento com `evento_id` e `id_interno` (numeração por
+evento, única pelo índice `(evento_id, id_interno)`). O próximo número vem
+de um `$inc` no contador `tarefas_seq` do evento, atômico no servidor: duas
+criações simultâneas nunca recebem o mesmo id, ao contrário do antigo
+`len(tarefas) + 1`.
+
+As respostas de evento continuam trazendo `tarefas`, montadas aqui a partir
+da coleção com uma consulta por página de eventos.
+
+Eventos antigos ainda com o array `tarefas` embutido são migrados na
+inicialização da API (idempotente). Manualmente (na pasta backend):
+    python -m app.event_tasks migrar
+"""
+import asyncio
+import logging
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# Código de erro do MongoDB para violação de índice único
+DUPLICATE_KEY = 11000
+
+STATUS_PENDENTE = "Pendente"
+# Status que tiram a tarefa da lista de abertas
+STATUS_FINAIS = ("Concluída", "Cancelada")
+
+async def reservar_ids(db, filtro_evento: dict, quantidade: int = 1) -> Optional[dict]:
+    """Reserva `quantidade` ids de tarefa no evento numa única escrita atômica.
+
+    Retorna `{"_id", "titulo", "primeiro_id"}` ou None se o evento não existir.
+    """
+    evento = await db.eventos.find_one_and_update(
+        filtro_evento,
+        {"$inc": {"tarefas_seq": quantidade}},
+        projection={"_id": 1, "titulo": 1, "tarefas_seq": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if evento is None:
+        return None
+    return {
+        "_id": evento["_id"],
+        "titulo": evento.get("titulo"),
+        "primeiro_id": evento["tarefas_seq"] - quantidade + 1,
+    }
+
+def tarefa_publica(doc: dict) -> dict:
+    """Documento da coleção no formato de `Tarefa` (sem `_id`, evento como str)."""
+    tarefa = {k: v for k, v in doc.items() if k != "_id"}
+    if isinstance(tarefa.get("evento_id"), ObjectId):
+        tarefa["evento_id"] = str(tarefa["evento_id"])
+    return tarefa
+
+async def tarefas_por_evento(db, evento_ids: Iterable[ObjectId]) -> Dict[ObjectId, List[dict]]:
+    """Tarefas de vários eventos com uma consulta, em ordem de `id_interno`."""
+    agrupadas: Dict[ObjectId, List[dict]] = defaultdict(list)
+    ids = list(evento_ids)
+    if not ids:
+        return agrupadas
+    cursor = db.tarefas.find({"evento_id": {"$in": ids}}).sort([("evento_id", 1), ("id_interno", 1)])
+    async for doc in cursor:
+        agrupadas[doc["evento_id"]].append(tarefa_publica(doc))
+    return agrupadas
+
+async def anexar_tarefas(db, eventos: List[dict]) -> List[dict]:
+    """Preenche `tarefas` dos eventos (ainda com `_id`) a partir da coleção."""
+    agrupadas = await tarefas_por_evento(db, (e["_id"] for e in eventos))
+    for evento in eventos:
+        evento["tarefas"] = agrupadas.get(evento["_id"], [])
+    return eventos
+
+async def contagens_por_evento(db, evento_ids: Iterable[ObjectId]) -> Dict[ObjectId, dict]:
+    """`{evento_id: {"total_tarefas", "tarefas_pendentes"}}` com uma agregação."""
+    ids = list(evento_ids)
+    if not ids:
+        return {}
+    pipeline = [
+        {"$match": {"evento_id": {"$in": ids}}},
+        {"$group": {
+            "_id": "$evento_id",
+            "total_tarefas": {"$sum": 1},
+            "tarefas_pendentes": {"$sum": {"$cond": [{"$eq": ["$status", STATUS_PENDENTE]}, 1, 0]}},
+        }},
+    ]
+    return {c.pop("_id"): c async for c in db.tarefas.aggregate(pipeline)}
+
+# --- MIGRAÇÃO DOS ARRAYS EMBUTIDOS ---
+async def migrar_tarefas_embutidas(db) -> dict:
+    """Move `eventos.tarefas` para a coleção `tarefas` e ajusta `tarefas_seq`.
+
+    Ids repetidos dentro do mesmo evento (criações simultâneas no modelo
+    antigo) recebem números novos depois do maior. Pode ser repetida: as
+    tarefas são gravadas com upsert por `(evento_id, id_interno)`. Se alguma
+    cópia falhar (fora chave duplicada), o array fica no evento e entra em
+    `falhas`, para a próxima execução.
+    """
+    report = {"eventos": 0, "tarefas": 0, "renumeradas": 0, "falhas": 0}
+    cursor = db.eventos.find({"tarefas": {"$exists": True}}, {"tarefas": 1, "tarefas_seq": 1})
+    async for evento in cursor:
+        tarefas = evento.get("tarefas") or []
+        maior = max([t.get("id_interno") or 0 for t in tarefas] + [evento.get("tarefas_seq") or 0])
+        vistos = set()
+        operacoes = []
+        for tarefa in tarefas:
+            id_interno = tarefa.get("id_interno")
+            if not id_interno or id_interno in vistos:
+                maior += 1
+                id_interno = maior
+                report["renumeradas"] += 1
+            vistos.add(id_interno)
+            doc = {**tarefa, "evento_id": evento["_id"], "id_interno": id_interno}
+            operacoes.append(UpdateOne(
+                {"evento_id": evento["_id"], "id_interno": id_interno}, {"$setOnInsert": doc}, upsert=True
+            ))
+        # Contador antes da cópia: tarefas criadas durante a migração já
+        # recebem ids acima dos migrados
+        await db.eventos.update_one({"_id": evento["_id"]}, {"$max": {"tarefas_seq": maior}})
+        if operacoes:
+            try:
+                await db.tarefas.bulk_write(operacoes, ordered=False)
+            except BulkWriteError as e:
+                erros = e.details.get("writeErrors") or []
+                outros = [err for err in erros if err.get("code") != DUPLICATE_KEY]
+                if outros or e.details.get("writeConcernErrors"):
+                    # O array só sai do evento depois que todas as tarefas foram copiadas
+                    logger.error("Tarefas do evento %s não migradas: %s", evento["_id"], outros or e.details)
+                    report["falhas"] += 1
+                    continue
+                # Só chaves duplicadas: outro worker migrou o mesmo evento ao mesmo tempo
+                logger.info("Tarefas do evento %s já migradas por outro processo", evento["_id"])
+        await db.eventos.update_one({"_id": evento["_id"]}, {"$unset": {"tarefas": ""}})
+        report["eventos"] += 1
+        report["tarefas"] += len(operacoes)
+    if report["eventos"] or report["falhas"]:
+        logger.info(
+            "Tarefas migradas: %s em %s eventos (%s renumeradas, %s eventos com falha)",
+            report["tarefas"], report["eventos"], report["renumeradas"], report["falhas"],
+        )
+    return report
+
+async def _main(args) -> None:
+    from app.database import mongo_db
+    from app.mongo_indexes import ensure_mongo_indexes
+
+    if (args[0] if args else "migrar") != "migrar":
+        raise SystemExit("Uso: python -m app.event_tasks migrar")
+    # O índice único (evento_id, id_interno) precisa existir antes da cópia
+    await ensure_mongo_indexes(mongo_db)
+    report = await migrar_tarefas_embutidas(mongo_db)
+    print(f"{report['tarefas']} tarefas migradas de {report['eventos']} eventos ({report['renumeradas']} renumeradas)")
+    if report["falhas"]:
+        print(f"ERRO: {report['falhas']} eventos não migrados (veja o log)")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(sys.argv[1:]))
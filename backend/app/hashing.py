@@ -0,0 +1,140 @@
+# app/hashing.py
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+from passlib.context import CryptContext
+from app.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Funções de módulo (e não métodos) para poderem ser enviadas a um ProcessPoolExecutor
+def hash_password_sync(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class ExecutorSaturated(Exception):
+    """A fila do executor está cheia; a requisição deve ser rejeitada."""
+
+
+class BoundedExecutor:
+    """Pool de tamanho fixo com limite de tarefas aguardando.
+
+    O bcrypt custa ~200 ms por chamada; rodando no event loop ele trava o
+    worker inteiro. Aqui o trabalho vai para um pool dedicado e, se já houver
+    `workers + max_queue` tarefas em andamento, `run` falha imediatamente com
+    `ExecutorSaturated` em vez de acumular espera.
+
+    `in_flight` só baixa quando o job termina de fato no pool (callback do
+    future), não quando quem aguardava é cancelado: um bcrypt já iniciado
+    continua ocupando o worker até o fim.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, max_queue: int = 32):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Tipo de executor inválido: {kind}")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        # Os callbacks dos futures rodam em threads do pool
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                # Nada de fork: o processo da API já tem threads (event loop,
+                # pools do MySQL/Mongo) e um filho criado por fork pode travar
+                metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(metodo)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _finalizado(self, fut: Future) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if fut.cancelled():
+                return
+            if fut.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def _submeter(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            self.in_flight += 1
+        try:
+            fut = self._get_executor().submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+        fut.add_done_callback(self._finalizado)
+        return fut
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise ExecutorSaturated()
+        # Cancelar o await cancela o job só se ele ainda não começou
+        return await asyncio.wrap_future(self._submeter(fn, *args))
+
+    async def run_many(self, fn: Callable[..., Any], argumentos: Sequence[tuple]) -> List[Any]:
+        """Roda `fn` para cada tupla de argumentos, tudo ou nada.
+
+        A capacidade é reservada para o lote inteiro antes de submeter:
+        se não couber, nada é enviado ao pool. Se um job falhar, os que ainda
+        não começaram são cancelados e os demais aguardados antes de propagar
+        o erro, para o lote não deixar trabalho órfão no pool.
+        """
+        if self.in_flight + len(argumentos) > self.capacity:
+            self.rejected += 1
+            raise ExecutorSaturated()
+        futs = [self._submeter(fn, *args) for args in argumentos]
+        try:
+            return list(await asyncio.gather(*(asyncio.wrap_future(f) for f in futs)))
+        except BaseException:
+            for f in futs:
+                f.cancel()
+            # Aguarda pelos futures do pool: os que já estão rodando não são cancelados
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in futs), return_exceptions=True)
+            raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+hash_executor = BoundedExecutor(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,76 @@
+# app/ical.py
+"""Geração de iCalendar (RFC 5545) para a agenda de eventos.
+
+Só o necessário para clientes de assinatura (Google Agenda, Outlook,
+Thunderbird): um VEVENT por evento, datas em UTC, texto escapado e linhas
+dobradas em 75 octetos. Cada função devolve texto pronto para ser enviado
+em streaming, sem montar o calendário inteiro em memória.
+"""
+from datetime import datetime, timezone
+
+CRLF = "\r\n"
+
+CABECALHO = CRLF.join([
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//SGCA//Eventos//PT-BR",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+    "X-WR-CALNAME:SGCA - Eventos",
+]) + CRLF
+RODAPE = "END:VCALENDAR" + CRLF
+
+# status do evento -> STATUS do VEVENT
+STATUS_ICS = {
+    "Rascunho": "TENTATIVE",
+    "Cancelado": "CANCELLED",
+}
+
+def escapar(texto) -> str:
+    return (
+        str(texto or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+def dobrar(linha: str) -> str:
+    """Quebra a linha em partes de até 75 octetos (continuações começam com espaço)."""
+    partes = []
+    atual, tamanho, limite = [], 0, 75
+    for c in linha:
+        n = len(c.encode("utf-8"))
+        if tamanho + n > limite:
+            partes.append("".join(atual))
+            # A continuação gasta 1 octeto com o espaço inicial
+            atual, tamanho, limite = [" "], 1, 75
+        atual.append(c)
+        tamanho += n
+    partes.append("".join(atual))
+    return CRLF.join(partes) + CRLF
+
+def data_utc(valor: datetime) -> str:
+    # Datas do Mongo chegam sem fuso e já em UTC
+    if valor.tzinfo is not None:
+        valor = valor.astimezone(timezone.utc)
+    return valor.strftime("%Y%m%dT%H%M%SZ")
+
+def vevent(evento: dict, carimbo: datetime) -> str:
+    """VEVENT de um documento de `eventos` (com `_id`)."""
+    linhas = [
+        "BEGIN:VEVENT",
+        f"UID:{evento['_id']}@sgca",
+        f"DTSTAMP:{data_utc(evento.get('atualizado_em') or evento.get('criado_em') or carimbo)}",
+        f"DTSTART:{data_utc(evento['data_inicio'])}",
+        f"DTEND:{data_utc(evento['data_fim'])}",
+        f"SUMMARY:{escapar(evento.get('titulo'))}",
+    ]
+    if evento.get("local"):
+        linhas.append(f"LOCATION:{escapar(evento['local'])}")
+    if evento.get("descricao"):
+        linhas.append(f"DESCRIPTION:{escapar(evento['descricao'])}")
+    linhas.append(f"STATUS:{STATUS_ICS.get(evento.get('status'), 'CONFIRMED')}")
+    linhas.append("END:VEVENT")
+    return "".join(dobrar(linha) for linha in linhas)
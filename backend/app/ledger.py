@@ -0,0 +1,737 @@
+# app/ledger.py
+"""Manutenção do livro-caixa (tabela `transacoes`) e dos totais por CA.
+
+Dois modos de lançamento (`LEDGER_MODE`):
+- "saldo": cada lançamento atualiza `centro_academico.saldo` e `ca_totais`
+  na mesma transação. Simples, mas lançamentos simultâneos do mesmo CA
+  serializam no lock dessa linha.
+- "append_only": lançamentos só inserem em `transacoes`. O saldo é a última
+  fotografia (`saldo_snapshots`) mais os lançamentos posteriores a ela, e o
+  compactador grava novas fotografias periodicamente (e espelha o resultado
+  em `centro_academico.saldo`/`ca_totais`). Ao voltar para o modo "saldo",
+  rode `snapshot` antes para que o saldo espelhado esteja completo.
+
+A conciliação (`reconciliar`) confere o saldo armazenado contra a soma dos
+lançamentos e pode corrigir a diferença.
+
+Uso (na pasta backend):
+    python -m app.ledger recompute [--ca ID]
+    python -m app.ledger snapshot
+    python -m app.ledger reconcile [--ca ID] [--reparar] [--chunk N]
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import case, delete, func, select, text, union_all, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.models.sql_models import (
+    CentroAcademico, SaldoSnapshot, TipoTransacao, TotaisCentroAcademico, Transacao, TransacaoArquivada,
+    TransacaoAuditoria,
+)
+
+logger = logging.getLogger(__name__)
+
+MODO_SALDO = "saldo"
+MODO_APPEND_ONLY = "append_only"
+
+# Relatórios por (ca_id, inicio, fim, granularidade, top) -> (marcador, relatório).
+# Períodos fechados nunca são recalculados, a menos que um lançamento caia
+# dentro deles; `invalidar_relatorios` descarta só os afetados neste processo
+# e o marcador (`marcador_lancamentos`) cobre as escritas de outros workers.
+report_cache = TTLCache(maxsize=settings.REPORT_CACHE_MAX_SIZE, ttl=settings.REPORT_CACHE_TTL_SECONDS)
+
+async def marcador_lancamentos(db: AsyncSession, centro_academico_id: int) -> Tuple[int, int]:
+    """(maior id de transação, maior id de auditoria) do CA, numa consulta.
+
+    Novos lançamentos mudam o primeiro; alterações e exclusões (que não mudam
+    esse id) deixam um registro novo na auditoria. Leituras de índice: serve
+    de validade para caches por CA entre workers.
+    """
+    ultimo_id = (
+        select(func.max(Transacao.id)).where(Transacao.centro_academico_id == centro_academico_id).scalar_subquery()
+    )
+    ultima_auditoria = (
+        select(func.max(TransacaoAuditoria.id))
+        .where(TransacaoAuditoria.centro_academico_id == centro_academico_id)
+        .scalar_subquery()
+    )
+    row = (await db.execute(select(ultimo_id, ultima_auditoria))).one()
+    return (row[0] or 0, row[1] or 0)
+
+def invalidar_relatorios(centro_academico_id: int, *datas: datetime) -> int:
+    """Descarta os relatórios em cache do CA cujo período contém alguma das datas."""
+    dias = {d.date() if isinstance(d, datetime) else d for d in datas if d is not None}
+
+    def afetado(key) -> bool:
+        ca_id, inicio, fim = key[:3]
+        return ca_id == centro_academico_id and any(inicio <= dia <= fim for dia in dias)
+
+    return report_cache.invalidate_where(afetado)
+
+# SUM(valor) de um tipo de transação, 0 quando não há lançamentos
+def _soma_tipo(tipo: TipoTransacao, fonte=Transacao):
+    return func.coalesce(func.sum(case((fonte.tipo == tipo, fonte.valor), else_=0)), 0)
+
+async def aplicar_totais(
+    db: AsyncSession,
+    centro_academico_id: int,
+    receitas: Decimal = Decimal("0"),
+    despesas: Decimal = Decimal("0"),
+    quantidade: int = 0,
+    ultima_transacao: Optional[datetime] = None,
+) -> None:
+    """Soma os deltas aos totais do CA (upsert), sem fazer commit."""
+    stmt = mysql_insert(TotaisCentroAcademico).values(
+        centro_academico_id=centro_academico_id,
+        receitas=receitas,
+        despesas=despesas,
+        quantidade=quantidade,
+        ultima_transacao=ultima_transacao,
+    )
+    t = TotaisCentroAcademico
+    stmt = stmt.on_duplicate_key_update(
+        receitas=t.receitas + stmt.inserted.receitas,
+        despesas=t.despesas + stmt.inserted.despesas,
+        quantidade=t.quantidade + stmt.inserted.quantidade,
+        ultima_transacao=func.greatest(
+            func.coalesce(t.ultima_transacao, stmt.inserted.ultima_transacao),
+            func.coalesce(stmt.inserted.ultima_transacao, t.ultima_transacao),
+        ),
+        atualizado_em=func.now(),
+    )
+    await db.execute(stmt)
+
+async def aplicar_lancamentos(
+    db: AsyncSession,
+    centro_academico_id: int,
+    receitas: Decimal,
+    despesas: Decimal,
+    quantidade: int,
+    ultima_transacao: Optional[datetime] = None,
+    modo: Optional[str] = None,
+) -> None:
+    """Reflete no saldo os lançamentos já adicionados à sessão (sem commit).
+
+    No modo "saldo" aplica o delta líquido com um único UPDATE e atualiza os
+    totais. No modo "append_only" não toca em nenhuma linha compartilhada,
+    desde que o CA já tenha fotografia (`preparar_lancamentos` antes das
+    escritas garante isso).
+    """
+    modo = modo or settings.LEDGER_MODE
+    if modo == MODO_APPEND_ONLY:
+        if centro_academico_id in _ca_com_snapshot:
+            return
+        # Sem fotografia conhecida: nada de sessão separada aqui (ela esperaria
+        # pelo lock de FK que os INSERTs desta transação já têm na linha do CA).
+        # Trava a linha nesta sessão e, se ainda não houver fotografia, aplica
+        # no modo "saldo": a fotografia inicial vai ler esse saldo após o commit.
+        await db.execute(
+            select(CentroAcademico.id).where(CentroAcademico.id == centro_academico_id).with_for_update()
+        )
+        existe = await db.execute(
+            select(SaldoSnapshot.id).where(SaldoSnapshot.centro_academico_id == centro_academico_id).limit(1)
+        )
+        if existe.first() is not None:
+            _ca_com_snapshot.add(centro_academico_id)
+            return
+
+    await db.execute(
+        update(CentroAcademico)
+        .where(CentroAcademico.id == centro_academico_id)
+        .values(saldo=CentroAcademico.saldo + (Decimal(str(receitas)) - Decimal(str(despesas))))
+    )
+    await aplicar_totais(
+        db,
+        centro_academico_id,
+        receitas=receitas,
+        despesas=despesas,
+        quantidade=quantidade,
+        ultima_transacao=ultima_transacao,
+    )
+
+async def corrigir_lancamento(
+    db: AsyncSession,
+    centro_academico_id: int,
+    transacao_id: int,
+    receitas: Decimal,
+    despesas: Decimal,
+    quantidade: int,
+    ultima_transacao: Optional[datetime] = None,
+    modo: Optional[str] = None,
+) -> None:
+    """Aplica o delta de uma transação alterada/excluída (sem commit).
+
+    Trava a linha do CA antes de tudo: no modo "saldo" é a mesma linha que os
+    lançamentos atualizam; no "append_only" serializa com o compactador, que
+    trava a mesma linha antes de somar. No modo append_only só as fotografias
+    que já incluem a transação (e o saldo espelhado delas) são corrigidas; as
+    posteriores recebem a alteração pelo próprio delta.
+    """
+    modo = modo or settings.LEDGER_MODE
+    await db.execute(
+        select(CentroAcademico.id).where(CentroAcademico.id == centro_academico_id).with_for_update()
+    )
+    if modo == MODO_APPEND_ONLY:
+        result = await db.execute(
+            update(SaldoSnapshot)
+            .where(
+                SaldoSnapshot.centro_academico_id == centro_academico_id,
+                SaldoSnapshot.ultima_transacao_id >= transacao_id,
+            )
+            .values(
+                saldo=SaldoSnapshot.saldo + (receitas - despesas),
+                receitas=SaldoSnapshot.receitas + receitas,
+                despesas=SaldoSnapshot.despesas + despesas,
+                quantidade=SaldoSnapshot.quantidade + quantidade,
+            )
+        )
+        if not result.rowcount:
+            existe = await db.execute(
+                select(SaldoSnapshot.id).where(SaldoSnapshot.centro_academico_id == centro_academico_id).limit(1)
+            )
+            if existe.first() is not None:
+                # Transação posterior à última fotografia: o delta já reflete a alteração
+                return
+
+    await aplicar_lancamentos(db, centro_academico_id, receitas, despesas, quantidade, ultima_transacao, modo=MODO_SALDO)
+
+# --- SALDO ATUAL ---
+async def saldo_atual(db: AsyncSession, centro_academico_id: int, modo: Optional[str] = None) -> Optional[dict]:
+    """Saldo, receitas e despesas do CA. Retorna None se o CA não existir."""
+    modo = modo or settings.LEDGER_MODE
+    if modo == MODO_APPEND_ONLY:
+        snapshot = await _ultimo_snapshot(db, centro_academico_id)
+        if snapshot is not None:
+            delta = await _delta_desde(db, centro_academico_id, snapshot.ultima_transacao_id)
+            return {
+                "saldo": snapshot.saldo + delta["receitas"] - delta["despesas"],
+                "receitas": snapshot.receitas + delta["receitas"],
+                "despesas": snapshot.despesas + delta["despesas"],
+                "atualizado_em": delta["ultima_transacao"] or snapshot.criado_em,
+            }
+        # Sem fotografia ainda: os valores do modo "saldo" continuam válidos
+
+    # Uma única leitura por chave primária: saldo do CA + totais acumulados
+    result = await db.execute(
+        select(
+            CentroAcademico.saldo,
+            TotaisCentroAcademico.receitas,
+            TotaisCentroAcademico.despesas,
+            TotaisCentroAcademico.atualizado_em,
+        )
+        .outerjoin(TotaisCentroAcademico, TotaisCentroAcademico.centro_academico_id == CentroAcademico.id)
+        .where(CentroAcademico.id == centro_academico_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return {
+        "saldo": row.saldo,
+        "receitas": row.receitas or Decimal("0"),
+        "despesas": row.despesas or Decimal("0"),
+        "atualizado_em": row.atualizado_em,
+    }
+
+async def _ultimo_snapshot(db: AsyncSession, centro_academico_id: int) -> Optional[SaldoSnapshot]:
+    result = await db.execute(
+        select(SaldoSnapshot)
+        .where(SaldoSnapshot.centro_academico_id == centro_academico_id)
+        .order_by(SaldoSnapshot.ultima_transacao_id.desc(), SaldoSnapshot.id.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+async def _delta_desde(
+    db: AsyncSession, centro_academico_id: int, depois_de_id: int, ate_id: Optional[int] = None, modelo=Transacao
+) -> dict:
+    # Índice (centro_academico_id, id): "ca = ? AND id > ?" é um range scan
+    # só sobre os lançamentos novos
+    filtros = [modelo.centro_academico_id == centro_academico_id, modelo.id > depois_de_id]
+    if ate_id is not None:
+        filtros.append(modelo.id <= ate_id)
+    result = await db.execute(
+        select(
+            _soma_tipo(TipoTransacao.Receita, modelo).label("receitas"),
+            _soma_tipo(TipoTransacao.Despesa, modelo).label("despesas"),
+            func.count(modelo.id).label("quantidade"),
+            func.max(modelo.data).label("ultima_transacao"),
+        ).where(*filtros)
+    )
+    row = result.one()
+    return {
+        "receitas": Decimal(row.receitas),
+        "despesas": Decimal(row.despesas),
+        "quantidade": row.quantidade,
+        "ultima_transacao": row.ultima_transacao,
+    }
+
+# --- FOTOGRAFIAS (modo append_only) ---
+_ca_com_snapshot: Set[int] = set()
+
+async def garantir_snapshot(centro_academico_id: int) -> None:
+    """Cria a fotografia inicial do CA a partir do saldo do modo "saldo".
+
+    Roda em sessão própria (antes do lançamento), com a linha do CA travada
+    para não competir com lançamentos ainda no modo "saldo".
+    """
+    if centro_academico_id in _ca_com_snapshot:
+        return
+    async with AsyncSessionLocal() as db:
+        ca = await db.execute(
+            select(CentroAcademico.saldo).where(CentroAcademico.id == centro_academico_id).with_for_update()
+        )
+        saldo = ca.scalar()
+        existe = await db.execute(
+            select(SaldoSnapshot.id).where(SaldoSnapshot.centro_academico_id == centro_academico_id).limit(1)
+        )
+        if saldo is not None and existe.first() is None:
+            totais = await db.get(TotaisCentroAcademico, centro_academico_id)
+            ultimo_id = await db.execute(
+                select(func.coalesce(func.max(Transacao.id), 0)).where(Transacao.centro_academico_id == centro_academico_id)
+            )
+            db.add(SaldoSnapshot(
+                centro_academico_id=centro_academico_id,
+                ultima_transacao_id=ultimo_id.scalar(),
+                saldo=saldo,
+                receitas=totais.receitas if totais else 0,
+                despesas=totais.despesas if totais else 0,
+                quantidade=totais.quantidade if totais else 0,
+            ))
+        await db.commit()
+    _ca_com_snapshot.add(centro_academico_id)
+
+async def preparar_lancamentos(centro_academico_id: int, modo: Optional[str] = None) -> None:
+    """Chamada antes de qualquer escrita da requisição: no modo append_only
+    cria a fotografia inicial do CA (em sessão própria) se ainda faltar."""
+    if (modo or settings.LEDGER_MODE) == MODO_APPEND_ONLY:
+        await garantir_snapshot(centro_academico_id)
+
+async def garantir_snapshots() -> None:
+    """Fotografia inicial de todos os CAs (no lifespan, antes do primeiro lançamento)."""
+    async with AsyncSessionLocal() as db:
+        ca_ids = (await db.execute(select(CentroAcademico.id))).scalars().all()
+    for ca_id in ca_ids:
+        await garantir_snapshot(ca_id)
+
+async def compactar(grace_seconds: Optional[float] = None) -> Dict[int, int]:
+    """Grava uma nova fotografia para cada CA com lançamentos desde a última.
+
+    Lê o maior id de cada CA, espera `grace_seconds` para que transações que
+    já reservaram ids menores terminem o commit e só então soma o intervalo,
+    com a linha do CA travada (o que também espera os INSERTs que já têm o
+    lock de FK nela).
+
+    Ainda assim um INSERT pode ter recebido o id antes da leitura e só
+    alcançar o lock de FK depois da fotografia (por exemplo, esperando atrás
+    de uma correção mais longa que a carência): ele fica com id abaixo do
+    coberto e o saldo derivado não o enxerga. Por isso cada rodada reconta o
+    último intervalo fotografado (`_lancamentos_atrasados`) e incorpora o que
+    tiver sido commitado depois. A espera pelo lock de FK é limitada por
+    `innodb_lock_wait_timeout`, menor que o intervalo do compactador, então
+    conferir só o último intervalo basta; com LEDGER_SNAPSHOTS_KEPT < 2 não
+    há intervalo para conferir.
+
+    Retorna `{ca_id: ultima_transacao_id}` das fotografias gravadas.
+    """
+    grace = settings.LEDGER_SNAPSHOT_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    gravadas = {}
+
+    # Um compactador por vez entre os workers; os demais pulam a rodada. O lock
+    # é da sessão MySQL: fica numa conexão dedicada durante toda a rodada (a
+    # sessão do ORM devolve a conexão ao pool a cada commit).
+    async with engine.connect() as lock_conn:
+        lock = await lock_conn.execute(text("SELECT GET_LOCK('sgca_ledger_compactor', 0)"))
+        if not lock.scalar():
+            return gravadas
+        try:
+            gravadas = await _compactar_rodada(grace)
+        finally:
+            await lock_conn.execute(text("SELECT RELEASE_LOCK('sgca_ledger_compactor')"))
+    return gravadas
+
+async def _compactar_rodada(grace: float) -> Dict[int, int]:
+    gravadas = {}
+    async with AsyncSessionLocal() as db:
+        await garantir_snapshots()
+
+        result = await db.execute(
+            select(Transacao.centro_academico_id, func.max(Transacao.id)).group_by(Transacao.centro_academico_id)
+        )
+        limites = dict(result.all())
+        await db.commit()
+        if grace:
+            await asyncio.sleep(grace)
+
+        for ca_id, limite in limites.items():
+            # Mesma trava de corrigir_lancamento: a fotografia anterior e o
+            # delta são lidos depois de qualquer correção já commitada
+            await db.execute(select(CentroAcademico.id).where(CentroAcademico.id == ca_id).with_for_update())
+            anterior = await _ultimo_snapshot(db, ca_id)
+            if anterior is None:
+                await db.commit()
+                continue
+            atrasados = await _lancamentos_atrasados(db, ca_id, anterior)
+            if limite <= anterior.ultima_transacao_id and atrasados is None:
+                await db.commit()
+                continue
+
+            espelho = {"receitas": Decimal("0"), "despesas": Decimal("0"), "quantidade": 0, "ultima_transacao": None}
+            if atrasados is not None:
+                logger.warning(
+                    "CA %s: %s lançamento(s) commitado(s) depois da fotografia até o id %s; incorporados",
+                    ca_id, atrasados["quantidade"], anterior.ultima_transacao_id,
+                )
+                # Como em corrigir_lancamento: a fotografia passa a incluí-los
+                anterior.saldo += atrasados["receitas"] - atrasados["despesas"]
+                anterior.receitas += atrasados["receitas"]
+                anterior.despesas += atrasados["despesas"]
+                anterior.quantidade += atrasados["quantidade"]
+                espelho = atrasados
+            atual = anterior
+            if limite > anterior.ultima_transacao_id:
+                delta = await _delta_desde(db, ca_id, anterior.ultima_transacao_id, limite)
+                atual = SaldoSnapshot(
+                    centro_academico_id=ca_id,
+                    ultima_transacao_id=limite,
+                    saldo=anterior.saldo + delta["receitas"] - delta["despesas"],
+                    receitas=anterior.receitas + delta["receitas"],
+                    despesas=anterior.despesas + delta["despesas"],
+                    quantidade=anterior.quantidade + delta["quantidade"],
+                )
+                db.add(atual)
+                espelho = {
+                    "receitas": espelho["receitas"] + delta["receitas"],
+                    "despesas": espelho["despesas"] + delta["despesas"],
+                    "quantidade": espelho["quantidade"] + delta["quantidade"],
+                    "ultima_transacao": max(
+                        (d for d in (espelho["ultima_transacao"], delta["ultima_transacao"]) if d is not None),
+                        default=None,
+                    ),
+                }
+            # Espelha a fotografia nas tabelas do modo "saldo" (uma escrita por rodada)
+            await db.execute(update(CentroAcademico).where(CentroAcademico.id == ca_id).values(saldo=atual.saldo))
+            await aplicar_totais(db, ca_id, **espelho)
+            await db.flush()
+            await _podar_snapshots(db, ca_id)
+            await db.commit()
+            gravadas[ca_id] = atual.ultima_transacao_id
+    return gravadas
+
+async def _lancamentos_atrasados(db: AsyncSession, centro_academico_id: int, anterior: SaldoSnapshot) -> Optional[dict]:
+    """Totais commitados no último intervalo fotografado e que ele não inclui.
+
+    Reconta `(penúltima, última]` nas transações e no arquivo e compara com a
+    diferença entre as duas fotografias (correções e exclusões ajustam as
+    duas do mesmo jeito). Retorna None se bater ou se não houver penúltima.
+    """
+    result = await db.execute(
+        select(SaldoSnapshot)
+        .where(
+            SaldoSnapshot.centro_academico_id == centro_academico_id,
+            SaldoSnapshot.ultima_transacao_id < anterior.ultima_transacao_id,
+        )
+        .order_by(SaldoSnapshot.ultima_transacao_id.desc(), SaldoSnapshot.id.desc())
+        .limit(1)
+    )
+    penultimo = result.scalars().first()
+    if penultimo is None:
+        return None
+
+    contado = {"receitas": Decimal("0"), "despesas": Decimal("0"), "quantidade": 0, "ultima_transacao": None}
+    for modelo in (Transacao, TransacaoArquivada):
+        parcial = await _delta_desde(
+            db, centro_academico_id, penultimo.ultima_transacao_id, anterior.ultima_transacao_id, modelo=modelo
+        )
+        contado["receitas"] += parcial["receitas"]
+        contado["despesas"] += parcial["despesas"]
+        contado["quantidade"] += parcial["quantidade"]
+        if modelo is Transacao:
+            contado["ultima_transacao"] = parcial["ultima_transacao"]
+
+    faltando = {
+        "receitas": contado["receitas"] - (anterior.receitas - penultimo.receitas),
+        "despesas": contado["despesas"] - (anterior.despesas - penultimo.despesas),
+        "quantidade": contado["quantidade"] - (anterior.quantidade - penultimo.quantidade),
+        "ultima_transacao": contado["ultima_transacao"],
+    }
+    if not (faltando["receitas"] or faltando["despesas"] or faltando["quantidade"]):
+        return None
+    return faltando
+
+async def _podar_snapshots(db: AsyncSession, centro_academico_id: int) -> None:
+    manter = (
+        select(SaldoSnapshot.id)
+        .where(SaldoSnapshot.centro_academico_id == centro_academico_id)
+        .order_by(SaldoSnapshot.ultima_transacao_id.desc())
+        .limit(settings.LEDGER_SNAPSHOTS_KEPT)
+    )
+    ids = (await db.execute(manter)).scalars().all()
+    if ids:
+        await db.execute(
+            delete(SaldoSnapshot).where(
+                SaldoSnapshot.centro_academico_id == centro_academico_id,
+                SaldoSnapshot.id.not_in(ids),
+            )
+        )
+
+async def compactador_loop() -> None:
+    """Tarefa de fundo (iniciada no lifespan no modo append_only)."""
+    while True:
+        try:
+            gravadas = await compactar()
+            if gravadas:
+                logger.info("Fotografias de saldo gravadas: %s", gravadas)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro no compactador do livro-caixa: {repr(e)}")
+        await asyncio.sleep(settings.LEDGER_SNAPSHOT_INTERVAL_SECONDS)
+
+# --- CONCILIAÇÃO ---
+async def _somar_em_blocos(
+    db: AsyncSession,
+    centro_academico_id: int,
+    ate_id: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    modelo=Transacao,
+    total: Optional[dict] = None,
+) -> dict:
+    """Soma os lançamentos do CA em blocos de `chunk_size` ids (keyset).
+
+    Cada bloco é agregado no próprio MySQL: só uma linha volta por consulta,
+    e nenhuma consulta varre mais que `chunk_size` linhas do índice
+    (centro_academico_id, id).
+    """
+    chunk_size = chunk_size or settings.LEDGER_RECONCILE_CHUNK_SIZE
+    if total is None:
+        total = {"receitas": Decimal("0"), "despesas": Decimal("0"), "quantidade": 0, "blocos": 0}
+    ultimo_id = 0
+    while True:
+        filtros = [modelo.centro_academico_id == centro_academico_id, modelo.id > ultimo_id]
+        if ate_id is not None:
+            filtros.append(modelo.id <= ate_id)
+        bloco = (
+            select(modelo.id, modelo.tipo, modelo.valor)
+            .where(*filtros)
+            .order_by(modelo.id)
+            .limit(chunk_size)
+            .subquery()
+        )
+        row = (await db.execute(
+            select(
+                func.coalesce(func.sum(case((bloco.c.tipo == TipoTransacao.Receita, bloco.c.valor), else_=0)), 0),
+                func.coalesce(func.sum(case((bloco.c.tipo == TipoTransacao.Despesa, bloco.c.valor), else_=0)), 0),
+                func.count(bloco.c.id),
+                func.max(bloco.c.id),
+            )
+        )).one()
+        receitas, despesas, quantidade, maior_id = row
+        if not quantidade:
+            return total
+        total["receitas"] += Decimal(receitas)
+        total["despesas"] += Decimal(despesas)
+        total["quantidade"] += quantidade
+        total["blocos"] += 1
+        ultimo_id = maior_id
+        if quantidade < chunk_size:
+            return total
+
+async def reconciliar(
+    db: AsyncSession,
+    centro_academico_id: int,
+    reparar: bool = False,
+    chunk_size: Optional[int] = None,
+    modo: Optional[str] = None,
+) -> Optional[dict]:
+    """Compara o saldo armazenado do CA com a soma dos lançamentos.
+
+    A leitura é uma única transação só com SELECTs simples: no InnoDB isso é
+    leitura consistente, sem lock, e o saldo armazenado e os lançamentos são
+    vistos no mesmo instante (lançamentos em andamento não geram divergência
+    falsa). No modo append_only a referência é a última fotografia, somando
+    só até a transação que ela cobre.
+
+    Com `reparar=True` a diferença é somada (delta, não valor absoluto) em
+    transação curta, para não sobrescrever lançamentos feitos durante a
+    varredura. Retorna None se o CA não existir.
+    """
+    modo = modo or settings.LEDGER_MODE
+    ca = (await db.execute(
+        select(CentroAcademico.saldo, TotaisCentroAcademico.receitas, TotaisCentroAcademico.despesas, TotaisCentroAcademico.quantidade)
+        .outerjoin(TotaisCentroAcademico, TotaisCentroAcademico.centro_academico_id == CentroAcademico.id)
+        .where(CentroAcademico.id == centro_academico_id)
+    )).first()
+    if ca is None:
+        await db.rollback()
+        return None
+
+    snapshot = await _ultimo_snapshot(db, centro_academico_id) if modo == MODO_APPEND_ONLY else None
+    if snapshot is not None:
+        ate_id = snapshot.ultima_transacao_id
+        armazenado = {
+            "saldo": snapshot.saldo, "receitas": snapshot.receitas,
+            "despesas": snapshot.despesas, "quantidade": snapshot.quantidade,
+        }
+    else:
+        modo, ate_id = MODO_SALDO, None
+        armazenado = {
+            "saldo": ca.saldo, "receitas": ca.receitas or Decimal("0"),
+            "despesas": ca.despesas or Decimal("0"), "quantidade": ca.quantidade or 0,
+        }
+
+    calculado = await _somar_em_blocos(db, centro_academico_id, ate_id, chunk_size)
+    # Anos arquivados (app.archive) também compõem o saldo
+    calculado = await _somar_em_blocos(db, centro_academico_id, ate_id, chunk_size, TransacaoArquivada, calculado)
+    calculado["saldo"] = calculado["receitas"] - calculado["despesas"]
+    # Fim da leitura consistente (libera o read view antes de qualquer escrita)
+    await db.rollback()
+
+    diferenca = {campo: calculado[campo] - armazenado[campo] for campo in ("saldo", "receitas", "despesas", "quantidade")}
+    divergente = any(diferenca.values())
+    reparado = False
+    if divergente and reparar:
+        if snapshot is not None:
+            # A fotografia divergente e as derivadas dela
+            await db.execute(
+                update(SaldoSnapshot)
+                .where(
+                    SaldoSnapshot.centro_academico_id == centro_academico_id,
+                    SaldoSnapshot.ultima_transacao_id >= snapshot.ultima_transacao_id,
+                )
+                .values(
+                    saldo=SaldoSnapshot.saldo + diferenca["saldo"],
+                    receitas=SaldoSnapshot.receitas + diferenca["receitas"],
+                    despesas=SaldoSnapshot.despesas + diferenca["despesas"],
+                    quantidade=SaldoSnapshot.quantidade + diferenca["quantidade"],
+                )
+            )
+        await db.execute(
+            update(CentroAcademico)
+            .where(CentroAcademico.id == centro_academico_id)
+            .values(saldo=CentroAcademico.saldo + diferenca["saldo"])
+        )
+        await aplicar_totais(
+            db, centro_academico_id,
+            receitas=diferenca["receitas"],
+            despesas=diferenca["despesas"],
+            quantidade=diferenca["quantidade"],
+        )
+        await db.commit()
+        reparado = True
+        logger.warning("CA %s: divergência corrigida no livro-caixa %s", centro_academico_id, diferenca)
+
+    return {
+        "centro_academico_id": centro_academico_id,
+        "modo": modo,
+        "ate_transacao_id": ate_id,
+        "saldo_armazenado": armazenado["saldo"],
+        "saldo_calculado": calculado["saldo"],
+        "receitas_armazenadas": armazenado["receitas"],
+        "receitas_calculadas": calculado["receitas"],
+        "despesas_armazenadas": armazenado["despesas"],
+        "despesas_calculadas": calculado["despesas"],
+        "quantidade_armazenada": armazenado["quantidade"],
+        "quantidade_calculada": calculado["quantidade"],
+        "blocos": calculado["blocos"],
+        "divergente": divergente,
+        "reparado": reparado,
+    }
+
+# --- RECÁLCULO ---
+def recalcular_totais_stmts(centro_academico_id: Optional[int] = None, incluir_arquivo: bool = True) -> list:
+    """Comandos que reconstroem `ca_totais` a partir de `transacoes` (e do arquivo).
+
+    Zera os totais do escopo e regrava com um INSERT ... SELECT agrupado, para
+    que CAs sem lançamentos também voltem a zero. Servem tanto para a sessão
+    assíncrona quanto para uma `Connection` síncrona (migrações).
+    """
+    zerar = update(TotaisCentroAcademico).values(
+        receitas=0, despesas=0, quantidade=0, ultima_transacao=None, atualizado_em=func.now()
+    )
+    modelos = (Transacao, TransacaoArquivada) if incluir_arquivo else (Transacao,)
+    partes = []
+    for modelo in modelos:
+        parte = select(modelo.centro_academico_id, modelo.tipo, modelo.valor, modelo.data, modelo.id)
+        if centro_academico_id is not None:
+            parte = parte.where(modelo.centro_academico_id == centro_academico_id)
+        partes.append(parte)
+    fonte = (union_all(*partes) if len(partes) > 1 else partes[0]).subquery()
+    agregado = select(
+        fonte.c.centro_academico_id,
+        _soma_tipo(TipoTransacao.Receita, fonte.c),
+        _soma_tipo(TipoTransacao.Despesa, fonte.c),
+        func.count(fonte.c.id),
+        func.max(fonte.c.data),
+    ).group_by(fonte.c.centro_academico_id)
+
+    if centro_academico_id is not None:
+        zerar = zerar.where(TotaisCentroAcademico.centro_academico_id == centro_academico_id)
+
+    regravar = mysql_insert(TotaisCentroAcademico).from_select(
+        ["centro_academico_id", "receitas", "despesas", "quantidade", "ultima_transacao"],
+        agregado,
+    )
+    regravar = regravar.on_duplicate_key_update(
+        receitas=regravar.inserted.receitas,
+        despesas=regravar.inserted.despesas,
+        quantidade=regravar.inserted.quantidade,
+        ultima_transacao=regravar.inserted.ultima_transacao,
+        atualizado_em=func.now(),
+    )
+    return [zerar, regravar]
+
+async def recalcular_totais(db: AsyncSession, centro_academico_id: Optional[int] = None) -> None:
+    for stmt in recalcular_totais_stmts(centro_academico_id):
+        await db.execute(stmt)
+    await db.commit()
+
+async def _main() -> None:
+    from app.database import engine
+
+    parser = argparse.ArgumentParser(description="Manutenção do livro-caixa")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    recompute = sub.add_parser("recompute", help="reconstrói ca_totais a partir das transações")
+    recompute.add_argument("--ca", type=int, default=None, help="apenas este centro acadêmico")
+    sub.add_parser("snapshot", help="grava uma fotografia de saldo de cada CA (modo append_only)")
+    reconcile = sub.add_parser("reconcile", help="confere o saldo armazenado contra a soma das transações")
+    reconcile.add_argument("--ca", type=int, default=None, help="apenas este centro acadêmico")
+    reconcile.add_argument("--reparar", action="store_true", help="corrige as divergências encontradas")
+    reconcile.add_argument("--chunk", type=int, default=None, help="transações por consulta")
+    args = parser.parse_args()
+
+    if args.comando == "recompute":
+        async with AsyncSessionLocal() as db:
+            await recalcular_totais(db, args.ca)
+        print("Totais recalculados" + (f" para o CA {args.ca}." if args.ca else " para todos os CAs."))
+    elif args.comando == "snapshot":
+        gravadas = await compactar()
+        print(f"Fotografias gravadas: {gravadas or 'nenhuma'}")
+    elif args.comando == "reconcile":
+        async with AsyncSessionLocal() as db:
+            ca_ids = [args.ca] if args.ca else (await db.execute(select(CentroAcademico.id))).scalars().all()
+            await db.rollback()
+            for ca_id in ca_ids:
+                r = await reconciliar(db, ca_id, reparar=args.reparar, chunk_size=args.chunk)
+                if r is None:
+                    print(f"CA {ca_id}: não encontrado.")
+                elif not r["divergente"]:
+                    print(f"CA {ca_id}: ok (saldo {r['saldo_calculado']}, {r['quantidade_calculada']} transações)")
+                else:
+                    print(
+                        f"CA {ca_id}: DIVERGENTE saldo armazenado {r['saldo_armazenado']} x calculado {r['saldo_calculado']}"
+                        + (" - corrigido" if r["reparado"] else "")
+                    )
+    await engine.dispose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
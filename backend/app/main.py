@@ -1,19 +1,43 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from app.database import engine, Base
+import asyncio
+from app.migrations import run_migrations
+from app.mongo_indexes import ensure_mongo_indexes
+from app.event_tasks import migrar_tarefas_embutidas
+from app.normalization import backfill_keys
+from app.database import mongo_db
+from app.hashing import hash_executor
+from app.onboarding import onboarding_executor
+from app.config import settings
+from app import ledger
 import os
 from app.routers import auth, members, finance, events, communication, patrimony
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import users
+from app.routers import users, internal
 from pydantic import BaseModel
 from typing import List, Optional
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Cria tabelas MySQL na inicialização (se não existirem)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Aplica as migrações pendentes do MySQL (cria as tabelas num banco novo)
+    await run_migrations()
+    # Chaves normalizadas (titulo_key/nome_key) de documentos antigos: as rotas
+    # por título e os índices únicos dependem delas
+    app.state.chaves_normalizadas = await backfill_keys(mongo_db)
+    # Reconcilia os índices das coleções do MongoDB com o catálogo
+    app.state.mongo_indexes = await ensure_mongo_indexes(mongo_db)
+    # Tarefas ainda embutidas em eventos antigos vão para a coleção `tarefas`
+    app.state.tarefas_migradas = await migrar_tarefas_embutidas(mongo_db)
+    # Modo append_only: fotografias iniciais de saldo + compactador periódico
+    compactador = None
+    if settings.LEDGER_MODE == ledger.MODO_APPEND_ONLY:
+        await ledger.garantir_snapshots()
+        compactador = asyncio.create_task(ledger.compactador_loop())
     yield
+    if compactador is not None:
+        compactador.cancel()
+    hash_executor.shutdown()
+    onboarding_executor.shutdown()
 
 app = FastAPI(
     title="SGCA API - Sistema de Gestão de Centro Acadêmico",
@@ -43,6 +67,7 @@ app.include_router(events.router)
 app.include_router(communication.router)
 app.include_router(patrimony.router)
 app.include_router(users.router)
+app.include_router(internal.router)
 
 @app.get("/")
 @app.get("/", response_model=dict)
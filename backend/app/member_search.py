@@ -0,0 +1,140 @@
+# app/member_search.py
+"""Busca de membros por prefixo de nome, email ou CPF.
+
+Cada CA tem um índice em memória: uma lista ordenada de chaves
+normalizadas (`normalize_key`: sem acentos e em casefold) e a busca por
+prefixo é um `bisect` seguido de uma varredura só do trecho que casa.
+Chaves indexadas por membro:
+
+- o nome completo e cada palavra do nome ("silva" encontra "João Silva");
+- o email;
+- os dígitos do CPF ("123.4" e "1234" buscam o mesmo prefixo).
+
+O índice é montado com uma consulta (só as colunas usadas) na primeira
+busca do CA e descartado a cada cadastro/alteração de membro no processo
+(`invalidar_busca`); o TTL cobre as escritas feitas por outros workers.
+"""
+import heapq
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import TTLCache
+from app.config import settings
+from app.models.sql_models import Usuario
+from app.normalization import normalize_key
+
+# Relevância (menor = melhor)
+EXATO, INICIO_NOME, PALAVRAS, EMAIL, CPF = range(5)
+
+# Prefixos que separam os campos dentro da mesma lista ordenada
+NOME, PALAVRA, CAMPO_EMAIL, CAMPO_CPF = "n:", "p:", "e:", "c:"
+
+# ca_id -> IndiceMembros
+search_cache = TTLCache(
+    maxsize=settings.MEMBER_SEARCH_CACHE_MAX_SIZE,
+    ttl=settings.MEMBER_SEARCH_TTL_SECONDS,
+)
+
+def invalidar_busca(*centro_academico_ids: Optional[int]) -> None:
+    for ca_id in centro_academico_ids:
+        if ca_id is not None:
+            search_cache.pop(ca_id)
+
+def somente_digitos(valor: Optional[str]) -> str:
+    return "".join(c for c in valor or "" if c.isdigit())
+
+@dataclass
+class _Membro:
+    dados: dict
+    nome_key: str
+    palavras: Tuple[str, ...]
+
+class IndiceMembros:
+    """Chaves normalizadas dos membros de um CA, ordenadas para busca por prefixo."""
+
+    def __init__(self, linhas: List[dict]):
+        self.membros: Dict[int, _Membro] = {}
+        entradas = []
+        for linha in linhas:
+            nome_key = normalize_key(linha["nome"])
+            palavras = tuple(nome_key.split())
+            self.membros[linha["id"]] = _Membro(linha, nome_key, palavras)
+            entradas.append((NOME + nome_key, linha["id"]))
+            entradas.extend((PALAVRA + palavra, linha["id"]) for palavra in set(palavras))
+            entradas.append((CAMPO_EMAIL + normalize_key(linha["email"]), linha["id"]))
+            cpf = somente_digitos(linha.get("cpf"))
+            if cpf:
+                entradas.append((CAMPO_CPF + cpf, linha["id"]))
+        entradas.sort()
+        self._chaves = [chave for chave, _ in entradas]
+        self._ids = [user_id for _, user_id in entradas]
+
+    def _prefixo(self, campo: str, prefixo: str):
+        """(chave sem o campo, id) de cada chave do campo que começa com `prefixo`."""
+        alvo = campo + prefixo
+        i = bisect_left(self._chaves, alvo)
+        while i < len(self._chaves) and self._chaves[i].startswith(alvo):
+            yield self._chaves[i][len(campo):], self._ids[i]
+            i += 1
+
+    def buscar(self, termo: str, limite: int) -> List[dict]:
+        """Até `limite` membros, por relevância e depois pela chave que casou.
+
+        Dentro de cada campo as chaves já estão nessa ordem, então cada
+        varredura para após `limite` membros: o custo não depende do tamanho
+        do CA nem de quantos membros o prefixo alcança.
+        """
+        chave = normalize_key(termo)
+        if not chave:
+            return []
+        # user_id -> (relevância, chave que casou)
+        melhores: Dict[int, Tuple[int, str]] = {}
+
+        def varrer(campo: str, prefixo: str, nivel: int, filtro=None, exato: bool = True) -> None:
+            encontrados = 0
+            for valor, user_id in self._prefixo(campo, prefixo):
+                if filtro is not None and not filtro(user_id):
+                    continue
+                ordem = (EXATO if exato and valor == prefixo else nivel, valor)
+                if ordem < melhores.get(user_id, (CPF + 1, "")):
+                    melhores[user_id] = ordem
+                encontrados += 1
+                if encontrados >= limite:
+                    break
+
+        varrer(NOME, chave, INICIO_NOME)
+        # Várias palavras em qualquer ordem: "silva joao" encontra "João da Silva"
+        tokens = chave.split()
+        varrer(PALAVRA, tokens[0], PALAVRAS, lambda user_id: all(
+            any(p.startswith(t) for p in self.membros[user_id].palavras) for t in tokens[1:]
+        ), exato=False)
+        varrer(CAMPO_EMAIL, chave, EMAIL)
+        # CPF só quando o termo parece um CPF (dígitos, pontos, hífen)
+        digitos = somente_digitos(chave)
+        if digitos and not set(chave) - set("0123456789.- "):
+            varrer(CAMPO_CPF, digitos, CPF)
+
+        ordenados = heapq.nsmallest(limite, melhores.items(), key=lambda item: (item[1], item[0]))
+        return [self.membros[user_id].dados for user_id, _ in ordenados]
+
+async def obter_indice(db: AsyncSession, centro_academico_id: int) -> IndiceMembros:
+    indice = search_cache.get(centro_academico_id)
+    if indice is None:
+        result = await db.execute(
+            select(
+                Usuario.id, Usuario.nome, Usuario.email, Usuario.cpf,
+                Usuario.cargo, Usuario.status, Usuario.departamento_id,
+            ).where(Usuario.centro_academico_id == centro_academico_id)
+        )
+        indice = IndiceMembros([dict(row._mapping) for row in result.all()])
+        search_cache.set(centro_academico_id, indice)
+    return indice
+
+async def buscar_membros(db: AsyncSession, centro_academico_id: int, termo: str, limite: int) -> List[dict]:
+    """Membros do CA que casam com `termo`, do mais para o menos relevante."""
+    indice = await obter_indice(db, centro_academico_id)
+    return indice.buscar(termo, limite)
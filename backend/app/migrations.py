@@ -0,0 +1,172 @@
+# app/migrations.py
+"""Migrações versionadas do schema MySQL.
+
+Cada migração é uma função síncrona registrada com `@migration(versao, nome)`
+e recebe uma `Connection` (executada via `run_sync`). As versões aplicadas
+ficam na tabela `schema_migrations`. As migrações devem ser idempotentes:
+um banco novo já nasce com o schema completo pela versão 1.
+
+Uso (na pasta backend):
+    python -m app.migrations upgrade
+    python -m app.migrations status
+"""
+import asyncio
+import logging
+import sys
+from dataclasses import dataclass
+from typing import Callable, List
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database import Base, engine
+from app.models import sql_models  # noqa: F401  (registra as tabelas no metadata)
+from app.ledger import recalcular_totais_stmts
+
+logger = logging.getLogger(__name__)
+
+_meta = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _meta,
+    Column("versao", Integer, primary_key=True, autoincrement=False),
+    Column("nome", String(200), nullable=False),
+    Column("aplicada_em", DateTime, server_default=func.now(), nullable=False),
+)
+
+@dataclass
+class Migration:
+    versao: int
+    nome: str
+    upgrade: Callable[[Connection], None]
+
+MIGRATIONS: List[Migration] = []
+
+def migration(versao: int, nome: str):
+    def decorator(fn: Callable[[Connection], None]):
+        MIGRATIONS.append(Migration(versao, nome, fn))
+        return fn
+    return decorator
+
+# --- HELPERS IDEMPOTENTES ---
+def add_column_if_missing(conn: Connection, table: str, column: Column) -> bool:
+    existing = {c["name"] for c in inspect(conn).get_columns(table)}
+    if column.name in existing:
+        return False
+    ddl = column.type.compile(dialect=conn.dialect)
+    default = f" DEFAULT {column.server_default.arg}" if column.server_default is not None else ""
+    nullable = "" if column.nullable else " NOT NULL"
+    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {ddl}{nullable}{default}"))
+    return True
+
+def create_index_if_missing(conn: Connection, index: Index) -> bool:
+    """Cria o índice, a menos que já exista um com o mesmo nome ou as mesmas colunas."""
+    table = index.table.name
+    wanted = [c.name for c in index.columns]
+    for existing in inspect(conn).get_indexes(table):
+        if existing["name"] == index.name or existing["column_names"] == wanted:
+            return False
+    index.create(conn)
+    logger.info("Índice criado: %s.%s (%s)", table, index.name, ", ".join(wanted))
+    return True
+
+# --- MIGRAÇÕES ---
+@migration(1, "schema inicial")
+def _schema_inicial(conn: Connection) -> None:
+    Base.metadata.create_all(conn)
+
+@migration(2, "usuarios.token_version")
+def _token_version(conn: Connection) -> None:
+    add_column_if_missing(conn, "usuarios", sql_models.Usuario.__table__.c.token_version)
+
+@migration(3, "índices de usuarios e transacoes")
+def _indices_consultas(conn: Connection) -> None:
+    for model in (sql_models.Usuario, sql_models.Transacao):
+        for index in model.__table__.indexes:
+            create_index_if_missing(conn, index)
+
+@migration(4, "ca_totais (totais acumulados por CA)")
+def _ca_totais(conn: Connection) -> None:
+    sql_models.TotaisCentroAcademico.__table__.create(conn, checkfirst=True)
+    # transacoes_arquivo só existe a partir da migração 7
+    for stmt in recalcular_totais_stmts(incluir_arquivo=False):
+        conn.execute(stmt)
+
+@migration(5, "saldo_snapshots (ledger append-only)")
+def _saldo_snapshots(conn: Connection) -> None:
+    sql_models.SaldoSnapshot.__table__.create(conn, checkfirst=True)
+
+@migration(6, "transacoes_auditoria")
+def _transacoes_auditoria(conn: Connection) -> None:
+    sql_models.TransacaoAuditoria.__table__.create(conn, checkfirst=True)
+
+@migration(7, "transacoes_arquivo e transacoes_corte")
+def _arquivo_transacoes(conn: Connection) -> None:
+    sql_models.TransacaoArquivada.__table__.create(conn, checkfirst=True)
+    sql_models.CorteArquivo.__table__.create(conn, checkfirst=True)
+
+@migration(8, "índices (centro_academico_id, id) de transacoes e transacoes_arquivo")
+def _indices_ca_id(conn: Connection) -> None:
+    # O índice implícito da FK pode não existir (o InnoDB reaproveita o
+    # (ca, data, id)); os ranges por id do livro-caixa precisam deste
+    for model, nome in (
+        (sql_models.Transacao, "ix_transacoes_ca_id"),
+        (sql_models.TransacaoArquivada, "ix_transacoes_arquivo_ca_id"),
+    ):
+        index = next(i for i in model.__table__.indexes if i.name == nome)
+        create_index_if_missing(conn, index)
+
+# --- EXECUÇÃO ---
+def _applied_versions(conn: Connection) -> set:
+    _meta.create_all(conn)
+    return set(conn.execute(select(schema_migrations.c.versao)).scalars())
+
+def _pending(applied: set) -> List[Migration]:
+    return sorted((m for m in MIGRATIONS if m.versao not in applied), key=lambda m: m.versao)
+
+async def run_migrations(db_engine: AsyncEngine = engine) -> List[str]:
+    """Aplica as migrações pendentes e retorna os nomes aplicados."""
+    aplicadas = []
+    async with db_engine.connect() as conn:
+        # Vários workers sobem ao mesmo tempo: só um migra por vez
+        is_mysql = conn.dialect.name == "mysql"
+        if is_mysql:
+            await conn.execute(text("SELECT GET_LOCK('sgca_migrations', 60)"))
+        try:
+            applied = await conn.run_sync(_applied_versions)
+            await conn.commit()
+            for m in _pending(applied):
+                logger.info("Aplicando migração %04d: %s", m.versao, m.nome)
+                await conn.run_sync(m.upgrade)
+                await conn.execute(schema_migrations.insert().values(versao=m.versao, nome=m.nome))
+                await conn.commit()
+                aplicadas.append(f"{m.versao:04d} {m.nome}")
+        finally:
+            if is_mysql:
+                await conn.execute(text("SELECT RELEASE_LOCK('sgca_migrations')"))
+    return aplicadas
+
+async def migration_status(db_engine: AsyncEngine = engine) -> List[str]:
+    async with db_engine.connect() as conn:
+        applied = await conn.run_sync(_applied_versions)
+        await conn.commit()
+    return [
+        f"[{'x' if m.versao in applied else ' '}] {m.versao:04d} {m.nome}"
+        for m in sorted(MIGRATIONS, key=lambda m: m.versao)
+    ]
+
+async def _main(args: List[str]) -> None:
+    comando = args[0] if args else "upgrade"
+    if comando == "upgrade":
+        aplicadas = await run_migrations()
+        print("\n".join(aplicadas) if aplicadas else "Nenhuma migração pendente.")
+    elif comando == "status":
+        print("\n".join(await migration_status()))
+    else:
+        raise SystemExit(f"Comando desconhecido: {comando} (use upgrade ou status)")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(sys.argv[1:]))
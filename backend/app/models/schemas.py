@@ -3,7 +3,7 @@ from typing import Optional, List, Any, Dict
 from datetime import date, datetime
 from enum import Enum
 import re
-from app.models.enums import CargoEnum, DepartamentoEnum, TipoTransacao
+from app.models.enums import CargoEnum, DepartamentoEnum, StatusEnum, TipoTransacao
 
 # --- Schemas de Centro Acadêmico ---
 class CentroAcademicoBase(BaseModel):
@@ -79,6 +79,39 @@ class UsuarioCreate(BaseModel):
     centro_academico_id: Optional[int] = None 
     departamento_id: Optional[int] = None
 
+class MembroImportLinha(UsuarioCreate):
+    # Cadastro em lote: cargo validado aqui (e não só no INSERT), padrão Membro
+    email: EmailStr
+    cargo: CargoEnum = CargoEnum.Membro
+    telefone: Optional[str] = None
+
+class MembroBulkCreate(BaseModel):
+    # Linhas cruas, validadas uma a uma como MembroImportLinha
+    membros: List[Dict[str, Any]]
+    # Se True, cadastra as linhas válidas mesmo havendo linhas com erro
+    parcial: bool = False
+
+class MembroImportResultado(BaseModel):
+    linha: int
+    email: Optional[str] = None
+    status: str
+    id: Optional[int] = None
+    erros: List[str] = []
+
+class MembroImportResponse(BaseModel):
+    criados: int
+    rejeitados: int
+    resultados: List[MembroImportResultado] = []
+
+class MembroBuscaResultado(BaseModel):
+    id: int
+    nome: str
+    email: str
+    cpf: Optional[str] = None
+    cargo: CargoEnum
+    status: StatusEnum
+    departamento_id: Optional[int] = None
+
 class UsuarioUpdate(BaseModel):
     nome: Optional[str] = None
     email: Optional[EmailStr] = None
@@ -108,7 +141,7 @@ class TransacaoCreate(TransacaoBase):
 
 class TransacaoUpdate(BaseModel):
     descricao: Optional[str] = None
-    valor: Optional[float] = None
+    valor: Optional[float] = Field(None, gt=0)
     data: Optional[datetime] = None
     tipo: Optional[str] = Field(None, pattern="^(Receita|Despesa)$")
 
@@ -119,12 +152,77 @@ class TransacaoResponse(TransacaoBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class TransacaoBulkCreate(BaseModel):
+    # Linhas cruas: cada uma é validada como TransacaoCreate individualmente,
+    # para que os erros sejam reportados por linha
+    transacoes: List[Dict[str, Any]]
+    # Se True, grava as linhas válidas mesmo havendo linhas com erro
+    parcial: bool = False
+
+class TransacaoImportError(BaseModel):
+    linha: int
+    erros: List[str]
+
+class TransacaoImportResponse(BaseModel):
+    inseridas: int
+    rejeitadas: int
+    saldo_delta: float
+    erros: List[TransacaoImportError] = []
+
+class TransacaoPage(BaseModel):
+    items: List[TransacaoResponse]
+    # Cursor opaco para a próxima página; None quando não há mais registros
+    next_cursor: Optional[str] = None
+
 # --- Schemas MongoDB (Eventos/Posts) ---
+class TarefaCreate(BaseModel):
+    descricao: str
+    status: str = "Pendente"
+    usuario_responsavel_id: int
+    prazo: Optional[datetime] = None
+
 class Tarefa(BaseModel):
     id_interno: int
     descricao: str
     status: str = "Pendente"
     usuario_responsavel_id: int
+    prazo: Optional[datetime] = None
+
+class TarefaLoteCreate(BaseModel):
+    tarefas: List[TarefaCreate] = Field(..., min_length=1, max_length=200)
+    # Se True, cria as tarefas válidas mesmo havendo tarefas com erro
+    parcial: bool = False
+
+class TarefaLoteResultado(BaseModel):
+    # Posição da tarefa no lote (a partir de 0)
+    indice: int
+    status: str
+    task_id: Optional[int] = None
+    erro: Optional[str] = None
+
+class TarefaLoteResponse(BaseModel):
+    criadas: int
+    rejeitadas: int
+    resultados: List[TarefaLoteResultado] = []
+
+class TarefaStatusLote(BaseModel):
+    task_ids: List[int] = Field(..., min_length=1, max_length=500)
+    status: str
+
+class TarefaStatusLoteResponse(BaseModel):
+    novo_status: str
+    # ids efetivamente alterados por esta requisição
+    alteradas: List[int] = []
+    # já estavam no status pedido (ou foram alteradas por outra requisição)
+    inalteradas: List[int] = []
+    # o usuário não é o responsável
+    negadas: List[int] = []
+    nao_encontradas: List[int] = []
+
+class MinhaTarefa(Tarefa):
+    evento_id: str
+    evento_titulo: Optional[str] = None
+    atualizado_em: Optional[datetime] = None
 
 class Patrocinio(BaseModel):
     nome_empresa: str
@@ -264,6 +362,34 @@ class EventoResponse(BaseModel):
     criado_em: Optional[datetime] = None
     criado_por: Optional[Dict[str, Any]] = None
 
+class EventoResumo(BaseModel):
+    """Campos do card do evento, sem as listas de tarefas e patrocínios."""
+    id: str
+    titulo: str
+    local: str
+    data_inicio: datetime
+    data_fim: datetime
+    orcamento_limite: Optional[float] = None
+    status: str
+    criado_em: Optional[datetime] = None
+    total_tarefas: int = 0
+    tarefas_pendentes: int = 0
+    total_patrocinios: int = 0
+    valor_patrocinios: float = 0
+
+class EventoCalendario(BaseModel):
+    id: str
+    titulo: str
+    local: str
+    data_inicio: datetime
+    data_fim: datetime
+    status: str
+
+class EventoResumoPage(BaseModel):
+    items: List[EventoResumo]
+    # Cursor opaco para a próxima página; None quando não há mais eventos
+    next_cursor: Optional[str] = None
+
 class PostagemUpdate(BaseModel):
     titulo: Optional[str] = None
     conteudo_texto: Optional[str] = None
@@ -289,6 +415,52 @@ class BalanceResponse(BaseModel):
     despesas: float
     ultima_atualizacao: str
 
+class ReconciliacaoResponse(BaseModel):
+    centro_academico_id: int
+    modo: str
+    ate_transacao_id: Optional[int] = None
+    saldo_armazenado: float
+    saldo_calculado: float
+    receitas_armazenadas: float
+    receitas_calculadas: float
+    despesas_armazenadas: float
+    despesas_calculadas: float
+    quantidade_armazenada: int
+    quantidade_calculada: int
+    blocos: int
+    divergente: bool
+    reparado: bool
+
+class AnaliseMes(BaseModel):
+    mes: str
+    receitas: float
+    despesas: float
+    liquido: float
+    variacao: Optional[float] = None
+    variacao_percentual: Optional[float] = None
+
+class AnaliseDia(BaseModel):
+    dia: str
+    burn_30d: float
+    burn_90d: float
+
+class ProjecaoSaldo(BaseModel):
+    tendencia_diaria: float
+    janela_dias: int
+    dias_ate_negativo: Optional[int] = None
+    data_saldo_negativo: Optional[str] = None
+
+class AnaliseFluxoResponse(BaseModel):
+    saldo_atual: float
+    burn_rate_30d: float
+    burn_rate_90d: float
+    fluxo_medio_30d: float
+    fluxo_medio_90d: float
+    meses: List[AnaliseMes] = []
+    serie: List[AnaliseDia] = []
+    projecao: ProjecaoSaldo
+    gerado_em: str
+
 class ReportTransaction(BaseModel):
     id: int
     data: str
@@ -297,14 +469,24 @@ class ReportTransaction(BaseModel):
     tipo: str
     responsavel: str
 
+class ReportBucket(BaseModel):
+    periodo: str
+    receitas: float
+    despesas: float
+    saldo: float
+    quantidade: int
+
 class ReportResponse(BaseModel):
     periodo: Dict[str, str]
     total_receitas: float
     total_despesas: float
     saldo_periodo: float
-    transacoes: List[ReportTransaction]
+    transacoes: List[ReportTransaction] = []
     total_registros: int
     gerado_em: str
+    granularidade: Optional[str] = None
+    serie: List[ReportBucket] = []
+    top_despesas: List[ReportTransaction] = []
 
 # --- Schemas comuns de criação/mensagem ---
 class CreatedResponse(BaseModel):
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DECIMAL, TIMESTAMP, Text, DateTime
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, DECIMAL, TIMESTAMP, Text, DateTime, Date, Index, JSON
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -40,6 +40,10 @@ class Departamento(Base):
 
 class Usuario(Base):
     __tablename__ = 'usuarios'
+    __table_args__ = (
+        # list_members filtra por CA; email e cpf já têm índices únicos (login)
+        Index("ix_usuarios_ca_nome", "centro_academico_id", "nome"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     nome = Column(String(100), nullable=False)
@@ -49,6 +53,8 @@ class Usuario(Base):
     telefone = Column(String(20), nullable=True)
     cargo = Column(Enum(CargoEnum), nullable=False, default=CargoEnum.Membro)
     status = Column(Enum(StatusEnum), nullable=False, default=StatusEnum.Ativo)
+    # Incrementado para revogar os tokens já emitidos (modo claims do JWT)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Chaves estrangeiras
     departamento_id = Column(Integer, ForeignKey('departamentos.id'), nullable=True)
@@ -64,6 +70,14 @@ class Usuario(Base):
 
 class Transacao(Base):
     __tablename__ = "transacoes"
+    __table_args__ = (
+        # list_transactions: WHERE ca = ? ORDER BY data DESC, id DESC
+        Index("ix_transacoes_ca_data_id", "centro_academico_id", "data", "id"),
+        # get_balance: SUM(valor) WHERE ca = ? AND tipo = ? (índice de cobertura)
+        Index("ix_transacoes_ca_tipo_valor", "centro_academico_id", "tipo", "valor"),
+        # Livro-caixa: WHERE ca = ? AND id > ? ORDER BY id (delta, compactador, conciliação)
+        Index("ix_transacoes_ca_id", "centro_academico_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     descricao = Column(String(200), nullable=False)
@@ -80,4 +94,94 @@ class Transacao(Base):
     centro_academico = relationship("CentroAcademico", back_populates="transacoes")
 
     def __repr__(self):
-        return f"<Transacao(id={self.id}, descricao='{self.descricao}', valor={self.valor})>"
\ No newline at end of file
+        return f"<Transacao(id={self.id}, descricao='{self.descricao}', valor={self.valor})>"
+
+class TotaisCentroAcademico(Base):
+    """Totais acumulados do livro-caixa de cada CA.
+
+    Mantidos na mesma transação de cada lançamento (ver app.ledger), para que
+    o saldo/receitas/despesas sejam lidos sem somar o histórico inteiro.
+    """
+    __tablename__ = "ca_totais"
+
+    centro_academico_id = Column(Integer, ForeignKey("centro_academico.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    receitas = Column(DECIMAL(15, 2), default=0.00, server_default="0", nullable=False)
+    despesas = Column(DECIMAL(15, 2), default=0.00, server_default="0", nullable=False)
+    quantidade = Column(Integer, default=0, server_default="0", nullable=False)
+    ultima_transacao = Column(DateTime, nullable=True)
+    atualizado_em = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+class SaldoSnapshot(Base):
+    """Fotografia do saldo de um CA até a transação `ultima_transacao_id`.
+
+    No modo de livro-caixa append-only (LEDGER_MODE=append_only) o saldo é a
+    última fotografia mais os lançamentos com id maior que ela.
+    """
+    __tablename__ = "saldo_snapshots"
+    __table_args__ = (
+        Index("ix_saldo_snapshots_ca_ultima", "centro_academico_id", "ultima_transacao_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    centro_academico_id = Column(Integer, ForeignKey("centro_academico.id", ondelete="CASCADE"), nullable=False)
+    ultima_transacao_id = Column(Integer, nullable=False, default=0)
+    saldo = Column(DECIMAL(15, 2), nullable=False)
+    receitas = Column(DECIMAL(15, 2), nullable=False, default=0.00)
+    despesas = Column(DECIMAL(15, 2), nullable=False, default=0.00)
+    quantidade = Column(Integer, nullable=False, default=0)
+    criado_em = Column(TIMESTAMP, server_default=func.now())
+
+
+class TransacaoAuditoria(Base):
+    """Registro de cada alteração/exclusão de transação (antes e depois).
+
+    Sem chave estrangeira para `transacoes`: o registro sobrevive à exclusão.
+    """
+    __tablename__ = "transacoes_auditoria"
+    __table_args__ = (
+        Index("ix_transacoes_auditoria_ca_transacao", "centro_academico_id", "transacao_id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    transacao_id = Column(Integer, nullable=False)
+    centro_academico_id = Column(Integer, ForeignKey("centro_academico.id", ondelete="CASCADE"), nullable=False)
+    usuario_id = Column(Integer, nullable=False)
+    acao = Column(String(20), nullable=False)
+    antes = Column(JSON, nullable=True)
+    depois = Column(JSON, nullable=True)
+    criado_em = Column(TIMESTAMP, server_default=func.now())
+
+
+class TransacaoArquivada(Base):
+    """Transações de anos fiscais fechados, movidas de `transacoes` (ver app.archive).
+
+    Mesmas colunas e mesmo id da transação original. Sem chave estrangeira
+    para `usuarios`: o histórico arquivado não impede excluir um membro.
+    """
+    __tablename__ = "transacoes_arquivo"
+    __table_args__ = (
+        Index("ix_transacoes_arquivo_ca_data_id", "centro_academico_id", "data", "id"),
+        Index("ix_transacoes_arquivo_ca_id", "centro_academico_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    descricao = Column(String(200), nullable=False)
+    valor = Column(DECIMAL(15, 2), nullable=False)
+    tipo = Column(Enum(TipoTransacao), nullable=False)
+    data = Column(DateTime, nullable=False)
+    usuario_id = Column(Integer, nullable=False)
+    centro_academico_id = Column(Integer, ForeignKey("centro_academico.id", ondelete="CASCADE"), nullable=False)
+
+
+class CorteArquivo(Base):
+    """Data de corte do arquivamento de cada CA.
+
+    Transações com `data < corte` estão em `transacoes_arquivo`; as demais, em
+    `transacoes`. Lançamentos com data anterior ao corte são recusados.
+    """
+    __tablename__ = "transacoes_corte"
+
+    centro_academico_id = Column(Integer, ForeignKey("centro_academico.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    corte = Column(Date, nullable=False)
+    atualizado_em = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
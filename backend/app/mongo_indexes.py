@@ -0,0 +1,141 @@
+# app/mongo_indexes.py
+"""Catálogo de índices do MongoDB, reconciliado na inicialização da API.
+
+Só os índices com o prefixo `sgca_` são gerenciados: os que faltam são
+criados, os que mudaram de definição são recriados e os que saíram do
+catálogo são removidos. Índices criados à mão (sem o prefixo) e o `_id_`
+nunca são tocados.
+
+Uso manual (na pasta backend):
+    python -m app.mongo_indexes
+"""
+import asyncio
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+MANAGED_PREFIX = "sgca_"
+
+INDEX_CATALOG: Dict[str, List[IndexModel]] = {
+    "eventos": [
+        # Listagem (mais recentes primeiro) paginada por (criado_em, _id)
+        IndexModel([("criado_em", DESCENDING), ("_id", DESCENDING)], name="sgca_eventos_criado_em"),
+        IndexModel(
+            [("status", ASCENDING), ("criado_em", DESCENDING), ("_id", DESCENDING)],
+            name="sgca_eventos_status_criado_em",
+        ),
+        # Agenda: sobreposição de [data_inicio, data_fim] com a janela. Cada
+        # índice limita um lado do intervalo; o planner escolhe o mais seletivo
+        # (janelas passadas pelo início, futuras pelo fim).
+        IndexModel([("data_inicio", ASCENDING), ("data_fim", ASCENDING)], name="sgca_eventos_periodo_inicio"),
+        IndexModel([("data_fim", ASCENDING), ("data_inicio", ASCENDING)], name="sgca_eventos_periodo_fim"),
+        # Busca por título via chave normalizada (app.normalization)
+        IndexModel(
+            [("titulo_key", ASCENDING)], name="sgca_eventos_titulo_key", unique=True,
+            partialFilterExpression={"titulo_key": {"$type": "string"}},
+        ),
+    ],
+    "tarefas": [
+        # Numeração por evento (app.event_tasks) e lista de tarefas do evento
+        IndexModel(
+            [("evento_id", ASCENDING), ("id_interno", ASCENDING)], name="sgca_tarefas_evento_id_interno", unique=True,
+        ),
+        # /events/tasks/mine: tarefas do membro por status, ordenadas pelo prazo
+        IndexModel(
+            [("usuario_responsavel_id", ASCENDING), ("status", ASCENDING), ("prazo", ASCENDING)],
+            name="sgca_tarefas_responsavel_status_prazo",
+        ),
+    ],
+    "patrimonio": [
+        IndexModel(
+            [("nome_key", ASCENDING)], name="sgca_patrimonio_nome_key", unique=True,
+            partialFilterExpression={"nome_key": {"$type": "string"}},
+        ),
+    ],
+    "comunicacao": [
+        IndexModel([("data_agendamento", DESCENDING)], name="sgca_comunicacao_data_agendamento"),
+    ],
+    "solicitacoes_comunicacao": [
+        IndexModel([("data_solicitacao", DESCENDING)], name="sgca_solicitacoes_data_solicitacao"),
+    ],
+}
+
+# Opções que, se diferentes, exigem recriar o índice
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+def _same_definition(wanted: dict, existing: dict) -> bool:
+    if [tuple(k) for k in wanted["key"].items()] != [tuple(k) for k in existing["key"]]:
+        return False
+    for option in _COMPARED_OPTIONS:
+        if wanted.get(option) != existing.get(option):
+            return False
+    wanted_collation = wanted.get("collation")
+    existing_collation = existing.get("collation")
+    if bool(wanted_collation) != bool(existing_collation):
+        return False
+    if wanted_collation:
+        for field in ("locale", "strength"):
+            if wanted_collation.get(field) != existing_collation.get(field):
+                return False
+    return True
+
+async def ensure_mongo_indexes(db, catalog: Dict[str, List[IndexModel]] = INDEX_CATALOG) -> dict:
+    """Reconcilia os índices do banco com o catálogo. Idempotente."""
+    report = {"created": [], "rebuilt": [], "dropped": [], "unchanged": [], "errors": []}
+
+    for collection_name, models in catalog.items():
+        collection = db[collection_name]
+        try:
+            existing = await collection.index_information()
+        except PyMongoError as e:
+            report["errors"].append(f"{collection_name}: {e}")
+            continue
+
+        wanted_names = set()
+        for model in models:
+            spec = model.document
+            name = spec["name"]
+            wanted_names.add(name)
+            label = f"{collection_name}.{name}"
+            try:
+                if name in existing:
+                    if _same_definition(spec, existing[name]):
+                        report["unchanged"].append(label)
+                        continue
+                    await collection.drop_index(name)
+                    await collection.create_indexes([model])
+                    report["rebuilt"].append(label)
+                else:
+                    await collection.create_indexes([model])
+                    report["created"].append(label)
+            except PyMongoError as e:
+                report["errors"].append(f"{label}: {e}")
+
+        for name in existing:
+            if name.startswith(MANAGED_PREFIX) and name not in wanted_names:
+                try:
+                    await collection.drop_index(name)
+                    report["dropped"].append(f"{collection_name}.{name}")
+                except PyMongoError as e:
+                    report["errors"].append(f"{collection_name}.{name}: {e}")
+
+    for action in ("created", "rebuilt", "dropped"):
+        for label in report[action]:
+            logger.info("Índice Mongo %s: %s", action, label)
+    for error in report["errors"]:
+        logger.error("Falha ao reconciliar índice Mongo: %s", error)
+    return report
+
+async def _main() -> None:
+    from app.database import mongo_db
+    report = await ensure_mongo_indexes(mongo_db)
+    for action, labels in report.items():
+        print(f"{action}: {', '.join(labels) if labels else '-'}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -0,0 +1,81 @@
+# app/normalization.py
+"""Chaves normalizadas para busca por título/nome no MongoDB.
+
+`titulo_key` (eventos) e `nome_key` (patrimônio) guardam o texto sem acentos,
+em casefold e com espaços colapsados. Com um índice único nesses campos a
+busca vira uma igualdade indexada, no lugar do `$regex` case-insensitive.
+
+Documentos antigos são preenchidos na inicialização da API (antes dos
+índices). Manualmente (na pasta backend):
+    python -m app.normalization backfill
+"""
+import asyncio
+import logging
+import sys
+import unicodedata
+from collections import defaultdict
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# coleção -> (campo de origem, campo da chave)
+KEYED_FIELDS = {
+    "eventos": ("titulo", "titulo_key"),
+    "patrimonio": ("nome", "nome_key"),
+}
+
+def normalize_key(value: str) -> str:
+    """'  Semana  de Calouros ' e 'semana de calouros' geram a mesma chave."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(without_accents.casefold().split())
+
+async def backfill_keys(db, batch_size: int = 500) -> dict:
+    """Preenche/corrige as chaves normalizadas e aponta duplicidades.
+
+    Documentos com a mesma chave impedem a criação do índice único; eles são
+    listados no relatório para correção manual.
+    """
+    report = {}
+    for collection_name, (field, key_field) in KEYED_FIELDS.items():
+        collection = db[collection_name]
+        updated = 0
+        seen = defaultdict(list)
+        batch = []
+
+        cursor = collection.find({}, {field: 1, key_field: 1})
+        async for doc in cursor:
+            key = normalize_key(doc.get(field) or "")
+            seen[key].append(str(doc["_id"]))
+            if doc.get(key_field) != key:
+                batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {key_field: key}}))
+            if len(batch) >= batch_size:
+                updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+                batch = []
+        if batch:
+            updated += (await collection.bulk_write(batch, ordered=False)).modified_count
+
+        duplicates = {k: ids for k, ids in seen.items() if len(ids) > 1}
+        for key, ids in duplicates.items():
+            logger.warning("%s: chave '%s' duplicada nos documentos %s", collection_name, key, ", ".join(ids))
+        report[collection_name] = {"atualizados": updated, "duplicados": duplicates}
+    return report
+
+async def _main(args) -> None:
+    from app.database import mongo_db
+    from app.mongo_indexes import ensure_mongo_indexes
+
+    if (args[0] if args else "backfill") != "backfill":
+        raise SystemExit("Uso: python -m app.normalization backfill")
+    report = await backfill_keys(mongo_db)
+    for collection_name, result in report.items():
+        print(f"{collection_name}: {result['atualizados']} atualizados, {len(result['duplicados'])} chaves duplicadas")
+    # Com as chaves preenchidas, os índices únicos podem ser criados
+    index_report = await ensure_mongo_indexes(mongo_db)
+    for error in index_report["errors"]:
+        print(f"ERRO: {error}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(sys.argv[1:]))
@@ -0,0 +1,171 @@
+# app/onboarding.py
+"""Cadastro de membros em lote (início de gestão / matrículas).
+
+Fluxo de `cadastrar_membros`:
+1. valida cada linha (MembroImportLinha) e aponta repetições dentro do lote;
+2. confere email/CPF já cadastrados com uma única consulta IN;
+3. gera os hashes bcrypt em paralelo num pool de processos próprio;
+4. grava todas as linhas num único INSERT em lote e um só commit.
+
+Usado pela rota POST /membros/bulk (e /membros/import) e pelo
+`seed_users.py --bulk`.
+"""
+import csv
+import io
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.hashing import BoundedExecutor, hash_password_sync
+from app.models.schemas import MembroImportLinha, MembroImportResponse, MembroImportResultado
+from app.models.enums import StatusEnum
+from app.models.sql_models import Usuario
+
+CSV_COLUNAS = ("nome", "email", "senha", "cpf", "telefone", "cargo", "departamento_id")
+
+onboarding_executor = BoundedExecutor(
+    kind="process",
+    workers=settings.ONBOARDING_HASH_WORKERS,
+    max_queue=settings.ONBOARDING_MAX_ROWS,
+)
+
+class LoteInvalido(Exception):
+    """Há linhas com erro e o cadastro não é parcial: nada foi gravado."""
+
+    def __init__(self, resultados: List[MembroImportResultado]):
+        super().__init__("Lote com linhas inválidas")
+        self.resultados = resultados
+
+def ler_csv(conteudo: str) -> List[Tuple[int, Dict[str, Any]]]:
+    """Linhas do CSV (separador , ou ;) como (número da linha, campos)."""
+    try:
+        dialeto = csv.Sniffer().sniff(conteudo.split("\n", 1)[0], delimiters=",;")
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.DictReader(io.StringIO(conteudo), dialect=dialeto)
+    faltando = {"nome", "email", "senha", "cpf"} - set(leitor.fieldnames or [])
+    if faltando:
+        raise ValueError(f"Colunas ausentes no CSV: {', '.join(sorted(faltando))}")
+
+    linhas = []
+    for row in leitor:
+        # Campos vazios ficam de fora para valerem os padrões do schema
+        linha = {c: row[c].strip() for c in CSV_COLUNAS if (row.get(c) or "").strip()}
+        linhas.append((leitor.line_num, linha))
+    return linhas
+
+async def gerar_hashes(senhas: List[str], executor: Optional[BoundedExecutor] = None) -> List[str]:
+    """Hashes na ordem das senhas; `ExecutorSaturated` se o lote não couber no pool."""
+    executor = executor or onboarding_executor
+    return await executor.run_many(hash_password_sync, [(senha,) for senha in senhas])
+
+def _erros_validacao(e: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(p) for p in err['loc']) or 'linha'}: {err['msg']}" for err in e.errors()]
+
+async def cadastrar_membros(
+    db: AsyncSession,
+    centro_academico_id: int,
+    linhas: List[Tuple[int, Dict[str, Any]]],
+    parcial: bool = False,
+    executor: Optional[BoundedExecutor] = None,
+) -> MembroImportResponse:
+    """Cadastra os membros válidos no CA e retorna o resultado de cada linha.
+
+    Com erros e `parcial=False` levanta `LoteInvalido` sem gravar nada.
+    """
+    resultados: Dict[int, MembroImportResultado] = {}
+    validas: List[Tuple[int, MembroImportLinha]] = []
+    vistos_email: Dict[str, int] = {}
+    vistos_cpf: Dict[str, int] = {}
+
+    for numero, linha in linhas:
+        try:
+            membro = MembroImportLinha.model_validate(linha)
+        except ValidationError as e:
+            resultados[numero] = MembroImportResultado(
+                linha=numero, email=linha.get("email"), status="erro", erros=_erros_validacao(e)
+            )
+            continue
+        # O MySQL compara emails sem diferenciar maiúsculas (collation *_ci)
+        chave_email = membro.email.lower()
+        erros = []
+        if chave_email in vistos_email:
+            erros.append(f"email repetido no lote (linha {vistos_email[chave_email]})")
+        if membro.cpf in vistos_cpf:
+            erros.append(f"cpf repetido no lote (linha {vistos_cpf[membro.cpf]})")
+        vistos_email.setdefault(chave_email, numero)
+        vistos_cpf.setdefault(membro.cpf, numero)
+        if erros:
+            resultados[numero] = MembroImportResultado(linha=numero, email=membro.email, status="erro", erros=erros)
+            continue
+        validas.append((numero, membro))
+
+    # Uma consulta para todos os emails/CPFs do lote (índices únicos)
+    if validas:
+        result = await db.execute(
+            select(Usuario.email, Usuario.cpf).where(or_(
+                Usuario.email.in_([m.email for _, m in validas]),
+                Usuario.cpf.in_([m.cpf for _, m in validas]),
+            ))
+        )
+        existentes = result.all()
+        emails = {e.lower() for e, _ in existentes}
+        cpfs = {c for _, c in existentes if c}
+        restantes = []
+        for numero, membro in validas:
+            erros = []
+            if membro.email.lower() in emails:
+                erros.append("email já cadastrado")
+            if membro.cpf in cpfs:
+                erros.append("cpf já cadastrado")
+            if erros:
+                resultados[numero] = MembroImportResultado(linha=numero, email=membro.email, status="erro", erros=erros)
+            else:
+                restantes.append((numero, membro))
+        validas = restantes
+
+    if resultados and not parcial:
+        raise LoteInvalido(sorted(resultados.values(), key=lambda r: r.linha))
+
+    if validas:
+        hashes = await gerar_hashes([m.senha for _, m in validas], executor)
+        try:
+            # executemany: um único comando INSERT para o lote inteiro
+            await db.execute(insert(Usuario), [
+                {
+                    "nome": membro.nome,
+                    "email": membro.email,
+                    "senha_hash": senha_hash,
+                    "cpf": membro.cpf,
+                    "telefone": membro.telefone,
+                    "cargo": membro.cargo,
+                    "status": StatusEnum.Ativo,
+                    "departamento_id": membro.departamento_id,
+                    "centro_academico_id": centro_academico_id,
+                }
+                for (_, membro), senha_hash in zip(validas, hashes)
+            ])
+            await db.commit()
+        except IntegrityError:
+            # Outro cadastro gravou o mesmo email/CPF depois da conferência
+            await db.rollback()
+            raise
+
+        result = await db.execute(
+            select(Usuario.id, Usuario.email).where(Usuario.email.in_([m.email for _, m in validas]))
+        )
+        ids = {email.lower(): user_id for user_id, email in result.all()}
+        for numero, membro in validas:
+            resultados[numero] = MembroImportResultado(
+                linha=numero, email=membro.email, status="criado", id=ids.get(membro.email.lower())
+            )
+
+    return MembroImportResponse(
+        criados=len(validas),
+        rejeitados=len(resultados) - len(validas),
+        resultados=sorted(resultados.values(), key=lambda r: r.linha),
+    )
@@ -3,22 +3,25 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import or_
 from sqlalchemy.orm import selectinload
 
 # Ajuste os imports conforme a estrutura das suas pastas
 from app.database import get_db
 from app.models.sql_models import Usuario, CentroAcademico, StatusEnum, CargoEnum
 from app.security import (
-    verify_password, 
+    verify_password_async,
     create_access_token, 
-    get_password_hash, 
+    build_token_claims,
+    sync_token_version,
+    get_password_hash_async,
     get_current_user, # Usado apenas no /me agora
+    invalidate_principal,
     oauth2_scheme,
     pwd_context
 )
 from app.models.schemas import Token, UsuarioCreate, UsuarioResponse
 from app.config import settings
+from app.member_search import invalidar_busca
 
 router = APIRouter(prefix="/auth", tags=["Autenticação"])
 
@@ -31,20 +34,16 @@ async def login_for_access_token(
     """
     Autentica um usuário e retorna um token JWT.
     """
-    # Busca usuário por email ou CPF
-    result = await db.execute(
-        select(Usuario)
-        .where(
-            or_(
-                Usuario.email == form_data.username,
-                Usuario.cpf == form_data.username
-            )
-        )
-    )
+    # Busca usuário por email ou CPF, em consultas separadas para que cada
+    # uma use o próprio índice único (o OR costuma virar full scan no MySQL)
+    result = await db.execute(select(Usuario).where(Usuario.email == form_data.username))
     user = result.scalars().first()
+    if user is None and "@" not in form_data.username:
+        result = await db.execute(select(Usuario).where(Usuario.cpf == form_data.username))
+        user = result.scalars().first()
     
     # Verifica senha
-    if not user or not verify_password(form_data.password, user.senha_hash):
+    if not user or not await verify_password_async(form_data.password, user.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email/CPF ou senha incorretos",
@@ -70,9 +69,10 @@ async def login_for_access_token(
     # Cria o token de acesso
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, 
+        data=build_token_claims(user), 
         expires_delta=access_token_expires
     )
+    sync_token_version(user)
     
     # Retorna o token e dados básicos
     return {
@@ -114,7 +114,7 @@ async def register_user(
             )
     
     # Cria o hash da senha
-    hashed_password = get_password_hash(user_data.senha)
+    hashed_password = await get_password_hash_async(user_data.senha)
     
     # Prepara os dados para salvar
     # .dict() é usado no Pydantic v1. Se usar v2, prefira .model_dump()
@@ -129,6 +129,8 @@ async def register_user(
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
+    invalidate_principal(db_user.email)
+    invalidar_busca(db_user.centro_academico_id)
     
     return db_user
 
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.database import get_mongo_db, get_db
@@ -6,20 +7,50 @@ from app.models.schemas import (
     EventoCreate,
     EventoUpdate,
     EventoResponse,
-    Tarefa,
+    EventoResumo,
+    EventoResumoPage,
+    EventoCalendario,
+    TarefaCreate,
+    TarefaLoteCreate,
+    TarefaLoteResultado,
+    TarefaLoteResponse,
+    TarefaStatusLote,
+    TarefaStatusLoteResponse,
+    MinhaTarefa,
     Patrocinio,
     CreatedResponse,
     TaskCreatedResponse,
     SimpleMessageResponse,
     MessageStatusResponse,
 )
-from app.security import get_current_user
+from app.security import get_current_user, get_current_principal, Principal
 from app.models.sql_models import Usuario, CargoEnum, Departamento
+from app.normalization import normalize_key
+from app import ical
+from app.event_tasks import (
+    STATUS_FINAIS,
+    anexar_tarefas,
+    contagens_por_evento,
+    reservar_ids,
+    tarefa_publica,
+)
 from bson import ObjectId
-from datetime import datetime
+from bson.errors import InvalidId
+from pymongo.errors import DuplicateKeyError
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple, Union
+import base64
+import hashlib
+import json
 
 router = APIRouter(prefix="/events", tags=["Gestão de Eventos"])
 
+def evento_query(evento_identificador: str) -> dict:
+    """Filtro do evento por ObjectId ou pelo título (chave normalizada, indexada)."""
+    if ObjectId.is_valid(evento_identificador):
+        return {"_id": ObjectId(evento_identificador)}
+    return {"titulo_key": normalize_key(evento_identificador)}
+
 @router.post("/", response_model=CreatedResponse)
 async def create_event(
     evento: EventoCreate,
@@ -31,12 +62,15 @@ async def create_event(
         raise HTTPException(status_code=403, detail="Permissão insuficiente.")
     
     # Verifica se já existe um evento com o mesmo título
-    existing = await db.eventos.find_one({"titulo": {"$regex": f"^{evento.titulo}$", "$options": "i"}})
+    titulo_key = normalize_key(evento.titulo)
+    existing = await db.eventos.find_one({"titulo_key": titulo_key}, {"_id": 1})
     if existing:
         raise HTTPException(status_code=400, detail="Já existe um evento com este título")
     
     evento_dict = evento.dict()
-    evento_dict["tarefas"] = []  # Inicia lista vazia
+    evento_dict["titulo_key"] = titulo_key
+    # Tarefas ficam na coleção `tarefas`; o contador numera as do evento
+    evento_dict["tarefas_seq"] = 0
     evento_dict["patrocinios"] = []
     evento_dict["criado_em"] = datetime.utcnow()
     evento_dict["criado_por"] = {
@@ -44,7 +78,10 @@ async def create_event(
         "nome": current_user.nome
     }
     
-    new_event = await db.eventos.insert_one(evento_dict)
+    try:
+        new_event = await db.eventos.insert_one(evento_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Já existe um evento com este título")
     return {"id": str(new_event.inserted_id), "message": "Evento criado com sucesso"}
 
 
@@ -59,25 +96,35 @@ async def update_event(
     if current_user.cargo not in [CargoEnum.Coordenador, CargoEnum.Presidente]:
         raise HTTPException(status_code=403, detail="Permissão insuficiente para atualizar evento.")
 
-    query = {}
-    if ObjectId.is_valid(evento_identificador):
-        query = {"_id": ObjectId(evento_identificador)}
-    else:
-        query = {"titulo": {"$regex": f"^{evento_identificador}$", "$options": "i"}}
-
-    evento = await db.eventos.find_one(query)
+    evento = await db.eventos.find_one(evento_query(evento_identificador), {"_id": 1})
     if not evento:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
 
     # Sanitiza campos e aplica atualização
-    update_dict = {k: v for k, v in update_data.items() if v is not None}
+    update_dict = {k: v for k, v in update_data.model_dump(exclude_unset=True).items() if v is not None}
     if not update_dict:
         raise HTTPException(status_code=400, detail="Nenhum campo para atualizar.")
 
-    result = await db.eventos.update_one({"_id": evento["_id"]}, {"$set": update_dict})
+    # Renomear exige manter a chave normalizada (e única) do título
+    if "titulo" in update_dict:
+        update_dict["titulo_key"] = normalize_key(update_dict["titulo"])
+        conflito = await db.eventos.find_one(
+            {"titulo_key": update_dict["titulo_key"], "_id": {"$ne": evento["_id"]}}, {"_id": 1}
+        )
+        if conflito:
+            raise HTTPException(status_code=400, detail="Já existe um evento com este título")
+
+    # Entra na versão (ETag) da agenda
+    update_dict["atualizado_em"] = datetime.utcnow()
+
+    try:
+        result = await db.eventos.update_one({"_id": evento["_id"]}, {"$set": update_dict})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Já existe um evento com este título")
     
     # Busca o documento atualizado para retornar
     updated = await db.eventos.find_one({"_id": evento["_id"]})
+    await anexar_tarefas(db, [updated])
     updated["id"] = str(updated["_id"])
     del updated["_id"]
     return updated
@@ -93,16 +140,8 @@ async def delete_event(
     if current_user.cargo != CargoEnum.Presidente:
         raise HTTPException(status_code=403, detail="Apenas o Presidente pode deletar eventos.")
 
-    query = {}
-    
-    # Verifica se a string passada é um ObjectId válido
-    if ObjectId.is_valid(evento_identificador):
-        query = {"_id": ObjectId(evento_identificador)}
-    else:
-        # Se não for ID, busca pelo título como antes
-        query = {"titulo": {"$regex": f"^{evento_identificador}$", "$options": "i"}}
-
-    evento = await db.eventos.find_one(query)
+    # Aceita ObjectId ou título
+    evento = await db.eventos.find_one(evento_query(evento_identificador), {"_id": 1})
     
     if not evento:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
@@ -111,42 +150,236 @@ async def delete_event(
     
     if result.deleted_count == 0:
         raise HTTPException(status_code=400, detail="Falha ao deletar evento")
-    
+
+    await db.tarefas.delete_many({"evento_id": evento["_id"]})
     return
 
-@router.get("/", response_model=list[EventoResponse])
+# Cursor da paginação: (criado_em, _id) do último evento visto, em base64 url-safe
+def encode_event_cursor(criado_em: datetime, evento_id: ObjectId) -> str:
+    raw = json.dumps([criado_em.isoformat(), str(evento_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_event_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        criado_em, evento_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(criado_em), ObjectId(evento_id)
+    except (ValueError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+
+def eventos_filtro(status: Optional[str], inicio: Optional[date], fim: Optional[date]) -> dict:
+    """Filtro por status e por eventos que acontecem entre `inicio` e `fim` (inclusivos)."""
+    filtro = {}
+    if status:
+        filtro["status"] = status
+    if inicio:
+        filtro["data_fim"] = {"$gte": datetime.combine(inicio, time.min)}
+    if fim:
+        filtro["data_inicio"] = {"$lt": datetime.combine(fim + timedelta(days=1), time.min)}
+    return filtro
+
+# Campos do card + contagens de patrocínios calculadas no servidor (o array não sai do Mongo)
+RESUMO_PROJECAO = {
+    "titulo": 1,
+    "local": 1,
+    "data_inicio": 1,
+    "data_fim": 1,
+    "orcamento_limite": 1,
+    "status": 1,
+    "criado_em": 1,
+    "total_patrocinios": {"$size": {"$ifNull": ["$patrocinios", []]}},
+    "valor_patrocinios": {"$sum": {"$ifNull": ["$patrocinios.valor", []]}},
+}
+
+@router.get("/", response_model=Union[EventoResumoPage, list[EventoResponse]])
 async def list_events(
+    resumo: bool = False,
+    limit: int = Query(50, ge=1, le=200, description="Eventos por página (modo resumo)"),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
     db = Depends(get_mongo_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    # Busca todos os eventos ordenados por data de criação (mais recentes primeiro)
-    events = await db.eventos.find().sort("criado_em", -1).to_list(length=1000)
-    
-    # Processamento para serialização
-    results = []
-    for event in events:
-        event["id"] = str(event["_id"])
-        del event["_id"]
-        results.append(event)
-        
-    return results
+    """Lista eventos, mais recentes primeiro.
+
+    - `resumo=true`: só os campos do card e as contagens de tarefas e
+      patrocínios, paginado por `cursor`; retorna `items` e `next_cursor`.
+      O documento completo fica para `GET /events/{id}`.
+    - Sem `resumo`: documentos completos (até 1000), como antes.
+
+    `status`, `inicio` e `fim` filtram nos dois modos.
+    """
+    filtro = eventos_filtro(status, inicio, fim)
+
+    if not resumo:
+        # Busca os eventos ordenados por data de criação (mais recentes primeiro)
+        events = await db.eventos.find(filtro).sort([("criado_em", -1), ("_id", -1)]).to_list(length=1000)
+        await anexar_tarefas(db, events)
+
+        # Processamento para serialização
+        results = []
+        for event in events:
+            event["id"] = str(event["_id"])
+            del event["_id"]
+            results.append(event)
+
+        return results
+
+    if cursor:
+        ultimo_criado_em, ultimo_id = decode_event_cursor(cursor)
+        filtro["$or"] = [
+            {"criado_em": {"$lt": ultimo_criado_em}},
+            {"criado_em": ultimo_criado_em, "_id": {"$lt": ultimo_id}},
+        ]
+
+    pipeline = [
+        {"$match": filtro},
+        {"$sort": {"criado_em": -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": RESUMO_PROJECAO},
+    ]
+    eventos = await db.eventos.aggregate(pipeline).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(eventos) > limit:
+        eventos = eventos[:limit]
+        if eventos[-1].get("criado_em") is not None:
+            next_cursor = encode_event_cursor(eventos[-1]["criado_em"], eventos[-1]["_id"])
+
+    # Contagens de tarefas da página inteira numa agregação na coleção `tarefas`
+    contagens = await contagens_por_evento(db, (e["_id"] for e in eventos))
+    for evento in eventos:
+        evento.update(contagens.get(evento["_id"], {}))
+        evento["id"] = str(evento.pop("_id"))
+    return EventoResumoPage(
+        items=[EventoResumo.model_validate(e) for e in eventos],
+        next_cursor=next_cursor
+    )
+
+# --- AGENDA ---
+# Janela máxima de uma consulta à agenda
+CALENDARIO_MAX_DIAS = 731
+# Eventos por lote lidos do cursor e enviados no ICS
+CALENDARIO_LOTE = 200
+CALENDARIO_PROJECAO = {
+    "titulo": 1,
+    "descricao": 1,
+    "local": 1,
+    "data_inicio": 1,
+    "data_fim": 1,
+    "status": 1,
+    "criado_em": 1,
+    "atualizado_em": 1,
+}
+
+def calendario_filtro(inicio: date, fim: date, status: Optional[str]) -> dict:
+    """Eventos cujo [data_inicio, data_fim] cruza os dias de `inicio` a `fim` (inclusivos)."""
+    filtro = {
+        "data_inicio": {"$lt": datetime.combine(fim + timedelta(days=1), time.min)},
+        "data_fim": {"$gte": datetime.combine(inicio, time.min)},
+    }
+    if status:
+        filtro["status"] = status
+    return filtro
+
+async def calendario_etag(db, filtro: dict, *chave) -> str:
+    """ETag da janela: quantidade de eventos e a última criação/alteração entre eles.
+
+    Criar, alterar (inclusive mover para dentro ou fora da janela) ou excluir
+    um evento muda um dos dois valores. Custa um `$group` sobre os eventos da
+    janela (filtrados pelos índices de período): cada documento do filtro é
+    lido no servidor, mas só um resultado volta para a API.
+    """
+    pipeline = [
+        {"$match": filtro},
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "ultima": {"$max": {"$ifNull": ["$atualizado_em", "$criado_em"]}},
+        }},
+    ]
+    versao = await db.eventos.aggregate(pipeline).to_list(length=1)
+    total, ultima = (versao[0]["total"], versao[0]["ultima"]) if versao else (0, None)
+    bruto = json.dumps([*chave, total, ultima.isoformat() if ultima else None], default=str)
+    return f'W/"{hashlib.sha1(bruto.encode()).hexdigest()}"'
+
+def etag_confere(request: Request, etag: str) -> bool:
+    recebidas = request.headers.get("if-none-match")
+    if not recebidas:
+        return False
+    return recebidas.strip() == "*" or etag in {t.strip() for t in recebidas.split(",")}
+
+@router.get("/calendar", response_model=list[EventoCalendario])
+async def events_calendar(
+    request: Request,
+    response: Response,
+    inicio: date = Query(..., alias="from"),
+    fim: date = Query(..., alias="to"),
+    status: Optional[str] = None,
+    formato: Optional[str] = Query(None, pattern="^(json|ics)$"),
+    db = Depends(get_mongo_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Eventos que acontecem entre `from` e `to`, em ordem de início.
+
+    Em JSON (padrão) ou iCalendar (`formato=ics` ou `Accept: text/calendar`),
+    este enviado em streaming. As respostas levam ETag: com `If-None-Match`
+    igual, responde 304 depois só da agregação da ETag, sem trazer nem
+    serializar os eventos.
+    """
+    if fim < inicio:
+        raise HTTPException(status_code=400, detail="'to' deve ser igual ou posterior a 'from'.")
+    if (fim - inicio).days > CALENDARIO_MAX_DIAS:
+        raise HTTPException(status_code=400, detail=f"Janela máxima de {CALENDARIO_MAX_DIAS} dias.")
+    if formato is None:
+        formato = "ics" if "text/calendar" in request.headers.get("accept", "") else "json"
+
+    filtro = calendario_filtro(inicio, fim, status)
+    etag = await calendario_etag(db, filtro, inicio, fim, status, formato)
+    cabecalhos = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_confere(request, etag):
+        return Response(status_code=304, headers=cabecalhos)
+
+    cursor = db.eventos.find(filtro, CALENDARIO_PROJECAO).sort([("data_inicio", 1), ("_id", 1)])
+
+    if formato == "ics":
+        async def gerar():
+            carimbo = datetime.utcnow()
+            yield ical.CABECALHO
+            lote = []
+            async for evento in cursor.batch_size(CALENDARIO_LOTE):
+                lote.append(ical.vevent(evento, carimbo))
+                if len(lote) >= CALENDARIO_LOTE:
+                    yield "".join(lote)
+                    lote = []
+            yield "".join(lote) + ical.RODAPE
+
+        return StreamingResponse(
+            gerar(),
+            media_type="text/calendar; charset=utf-8",
+            headers={**cabecalhos, "Content-Disposition": 'inline; filename="sgca-eventos.ics"'}
+        )
+
+    eventos = await cursor.to_list(length=None)
+    for evento in eventos:
+        evento["id"] = str(evento.pop("_id"))
+    response.headers.update(cabecalhos)
+    return eventos
+
 @router.get("/{evento_identificador}", response_model=EventoResponse)
 async def get_event(
     evento_identificador: str,
     db = Depends(get_mongo_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    query = {}
-    if ObjectId.is_valid(evento_identificador):
-        query = {"_id": ObjectId(evento_identificador)}
-    else:
-        query = {"titulo": {"$regex": f"^{evento_identificador}$", "$options": "i"}}
-
-    event = await db.eventos.find_one(query)
+    event = await db.eventos.find_one(evento_query(evento_identificador))
     
     if not event:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
     
+    await anexar_tarefas(db, [event])
     event["id"] = str(event["_id"])
     del event["_id"]
     
@@ -155,7 +388,7 @@ async def get_event(
 @router.post("/{evento_titulo}/tasks", response_model=TaskCreatedResponse)
 async def add_task_to_event(
     evento_titulo: str,
-    tarefa: Tarefa,
+    tarefa: TarefaCreate,
     current_user: Usuario = Depends(get_current_user),
     db = Depends(get_mongo_db),
     sql_db: AsyncSession = Depends(get_db)
@@ -174,40 +407,108 @@ async def add_task_to_event(
     elif current_user.cargo != CargoEnum.Presidente and current_user.cargo != CargoEnum.Coordenador:
         raise HTTPException(status_code=403, detail="Permissão insuficiente para adicionar tarefas.")
 
-    try:
-        # Busca o evento pelo título (case-insensitive)
-        evento = await db.eventos.find_one({"titulo": {"$regex": f"^{evento_titulo}$", "$options": "i"}})
-        
-        if not evento:
-            raise HTTPException(status_code=404, detail="Evento não encontrado")
-
-        # Gera um ID único para a tarefa
-        task_id = len(evento.get("tarefas", [])) + 1
-
-        # Adiciona a tarefa ao array de tarefas do evento
-        result = await db.eventos.update_one(
-            {"_id": evento["_id"]},
-            {"$push": {
-                "tarefas": {
-                    **tarefa.dict(),
-                    "id_interno": task_id,
-                    "criado_em": datetime.utcnow(),
-                    "criado_por": {
-                        "id": str(current_user.id),
-                        "nome": current_user.nome
-                    }
-                }
-            }}
-        )
-        
-        if result.modified_count == 0:
-            raise HTTPException(status_code=400, detail="Falha ao adicionar tarefa ao evento")
-            
-        return {"message": "Tarefa adicionada com sucesso", "task_id": task_id}
+    # Localiza o evento e reserva o id da tarefa na mesma escrita atômica
+    evento = await reservar_ids(db, evento_query(evento_titulo))
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
 
+    task_id = evento["primeiro_id"]
+    try:
+        await db.tarefas.insert_one({
+            **tarefa.model_dump(),
+            "evento_id": evento["_id"],
+            "id_interno": task_id,
+            "criado_em": datetime.utcnow(),
+            "criado_por": {
+                "id": str(current_user.id),
+                "nome": current_user.nome
+            }
+        })
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Erro ao processar a requisição: {str(e)}")
 
+    return {"message": "Tarefa adicionada com sucesso", "task_id": task_id}
+
+@router.post("/{evento_titulo}/tasks/batch", response_model=TarefaLoteResponse, status_code=201)
+async def add_tasks_batch(
+    evento_titulo: str,
+    lote: TarefaLoteCreate,
+    current_user: Usuario = Depends(get_current_user),
+    db = Depends(get_mongo_db),
+    sql_db: AsyncSession = Depends(get_db)
+):
+    """Cria várias tarefas no evento de uma vez, com o resultado de cada uma.
+
+    Os responsáveis são validados com uma única consulta IN (existência e,
+    para Coordenadores, a RN03) e as tarefas válidas entram com um só
+    `insert_many`, com ids reservados num único `$inc`.
+    """
+    if current_user.cargo not in [CargoEnum.Presidente, CargoEnum.Coordenador]:
+        raise HTTPException(status_code=403, detail="Permissão insuficiente para adicionar tarefas.")
+
+    result = await sql_db.execute(
+        select(Usuario.id, Usuario.departamento_id)
+        .where(Usuario.id.in_({t.usuario_responsavel_id for t in lote.tarefas}))
+    )
+    departamentos = dict(result.all())
+
+    resultados = {}
+    validas = []
+    for indice, tarefa in enumerate(lote.tarefas):
+        if tarefa.usuario_responsavel_id not in departamentos:
+            erro = "Usuário responsável pela tarefa não encontrado."
+        elif (
+            current_user.cargo == CargoEnum.Coordenador
+            and departamentos[tarefa.usuario_responsavel_id] != current_user.departamento_id
+        ):
+            erro = "Coordenadores só podem atribuir tarefas a membros do seu próprio departamento."
+        else:
+            validas.append((indice, tarefa))
+            continue
+        resultados[indice] = TarefaLoteResultado(indice=indice, status="erro", erro=erro)
+
+    if resultados and not lote.parcial:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": "Nenhuma tarefa foi criada: corrija as tarefas com erro ou use parcial=true.",
+                "resultados": [r.model_dump() for r in sorted(resultados.values(), key=lambda r: r.indice)]
+            }
+        )
+
+    if validas:
+        evento = await reservar_ids(db, evento_query(evento_titulo), quantidade=len(validas))
+    else:
+        evento = await db.eventos.find_one(evento_query(evento_titulo), {"_id": 1})
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    if validas:
+        agora = datetime.utcnow()
+        criado_por = {"id": str(current_user.id), "nome": current_user.nome}
+        docs = [
+            {
+                **tarefa.model_dump(),
+                "evento_id": evento["_id"],
+                "id_interno": evento["primeiro_id"] + n,
+                "criado_em": agora,
+                "criado_por": criado_por
+            }
+            for n, (_, tarefa) in enumerate(validas)
+        ]
+        try:
+            await db.tarefas.insert_many(docs)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Erro ao processar a requisição: {str(e)}")
+        for doc, (indice, _) in zip(docs, validas):
+            resultados[indice] = TarefaLoteResultado(indice=indice, status="criada", task_id=doc["id_interno"])
+
+    return TarefaLoteResponse(
+        criadas=len(validas),
+        rejeitadas=len(resultados) - len(validas),
+        resultados=sorted(resultados.values(), key=lambda r: r.indice)
+    )
+
 @router.put("/{evento_titulo}/tasks/{task_id}/status", response_model=MessageStatusResponse)
 async def update_task_status(
     evento_titulo: str,
@@ -216,52 +517,142 @@ async def update_task_status(
     current_user: Usuario = Depends(get_current_user),
     db = Depends(get_mongo_db)
 ):
-    # Encontra o evento pelo título
-    evento = await db.eventos.find_one({"titulo": {"$regex": f"^{evento_titulo}$", "$options": "i"}})
+    # Só o _id do evento: a tarefa é atualizada direto na coleção `tarefas`
+    evento = await db.eventos.find_one(evento_query(evento_titulo), {"_id": 1})
     if not evento:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
 
-    # Verifica se o usuário tem permissão (Presidente, Coordenador ou é o responsável)
-    is_allowed = (current_user.cargo in [CargoEnum.Presidente, CargoEnum.Coordenador])
-    
-    # Se não for Presidente nem Coordenador, verifica se é o responsável pela tarefa
-    if not is_allowed:
-        # Encontra a tarefa específica
-        for task in evento.get("tarefas", []):
-            if task.get("id_interno") == task_id:
-                if task.get("usuario_responsavel_id") == current_user.id:
-                    is_allowed = True
-                break
-
-    if not is_allowed:
+    filtro = {"evento_id": evento["_id"], "id_interno": task_id}
+    # Presidente e Coordenador alteram qualquer tarefa; os demais, só as suas
+    if current_user.cargo not in [CargoEnum.Presidente, CargoEnum.Coordenador]:
+        filtro["usuario_responsavel_id"] = current_user.id
+
+    result = await db.tarefas.update_one(
+        filtro,
+        {
+            "$set": {
+                "status": status,
+                "atualizado_em": datetime.utcnow(),
+                "atualizado_por": {
+                    "id": str(current_user.id),
+                    "nome": current_user.nome,
+                    "cargo": current_user.cargo.value
+                }
+            }
+        }
+    )
+
+    if result.matched_count == 0:
+        # Distingue tarefa inexistente de tarefa de outro responsável
+        existe = await db.tarefas.find_one({"evento_id": evento["_id"], "id_interno": task_id}, {"_id": 1})
+        if not existe:
+            raise HTTPException(status_code=404, detail="Tarefa não encontrada")
         raise HTTPException(
-            status_code=403, 
+            status_code=403,
             detail="Apenas o Presidente, Coordenador ou o responsável pela tarefa podem atualizar o status"
         )
 
-    # Atualiza o status da tarefa
-    result = await db.eventos.update_one(
-        {
-            "_id": evento["_id"],
-            "tarefas.id_interno": task_id
-        },
+    return {"message": "Status atualizado com sucesso", "novo_status": status}
+
+@router.put("/{evento_titulo}/tasks/status", response_model=TarefaStatusLoteResponse)
+async def update_tasks_status_bulk(
+    evento_titulo: str,
+    lote: TarefaStatusLote,
+    current_user: Usuario = Depends(get_current_user),
+    db = Depends(get_mongo_db)
+):
+    """Muda o status de várias tarefas do evento com um único `update_many`.
+
+    A regra do `update_task_status` vale por tarefa: quem não é Presidente
+    nem Coordenador só altera as tarefas de que é responsável. A escrita
+    marca as tarefas com o id da operação, e a leitura seguinte separa as
+    alteradas por esta requisição das demais.
+    """
+    evento = await db.eventos.find_one(evento_query(evento_titulo), {"_id": 1})
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    ids = sorted(set(lote.task_ids))
+    pode_todas = current_user.cargo in [CargoEnum.Presidente, CargoEnum.Coordenador]
+    filtro = {"evento_id": evento["_id"], "id_interno": {"$in": ids}, "status": {"$ne": lote.status}}
+    if not pode_todas:
+        filtro["usuario_responsavel_id"] = current_user.id
+
+    operacao = ObjectId()
+    await db.tarefas.update_many(
+        filtro,
         {
             "$set": {
-                "tarefas.$.status": status,
-                "tarefas.$.atualizado_em": datetime.utcnow(),
-                "tarefas.$.atualizado_por": {
+                "status": lote.status,
+                "atualizado_em": datetime.utcnow(),
+                "atualizado_por": {
                     "id": str(current_user.id),
                     "nome": current_user.nome,
                     "cargo": current_user.cargo.value
-                }
+                },
+                "operacao": operacao
             }
         }
     )
-    
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
-            
-    return {"message": "Status atualizado com sucesso", "novo_status": status}
+
+    resposta = TarefaStatusLoteResponse(novo_status=lote.status)
+    encontradas = set()
+    cursor = db.tarefas.find(
+        {"evento_id": evento["_id"], "id_interno": {"$in": ids}},
+        {"id_interno": 1, "usuario_responsavel_id": 1, "operacao": 1}
+    )
+    async for tarefa in cursor:
+        encontradas.add(tarefa["id_interno"])
+        if tarefa.get("operacao") == operacao:
+            resposta.alteradas.append(tarefa["id_interno"])
+        elif not pode_todas and tarefa.get("usuario_responsavel_id") != current_user.id:
+            resposta.negadas.append(tarefa["id_interno"])
+        else:
+            resposta.inalteradas.append(tarefa["id_interno"])
+    resposta.nao_encontradas = [i for i in ids if i not in encontradas]
+    for lista in (resposta.alteradas, resposta.inalteradas, resposta.negadas):
+        lista.sort()
+    return resposta
+
+@router.get("/tasks/mine", response_model=list[MinhaTarefa])
+async def list_my_tasks(
+    status: Optional[str] = Query(None, description="Sem status: apenas as tarefas em aberto"),
+    prazo_ate: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db = Depends(get_mongo_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Tarefas do usuário logado em todos os eventos, pelo prazo mais próximo.
+
+    Tarefas sem prazo vêm no fim (o Mongo ordenaria `null` antes de tudo).
+    """
+    filtro = {
+        "usuario_responsavel_id": current_user.id,
+        "status": status if status else {"$nin": list(STATUS_FINAIS)},
+    }
+    com_prazo = {"$ne": None}
+    if prazo_ate:
+        com_prazo["$lt"] = datetime.combine(prazo_ate + timedelta(days=1), time.min)
+
+    tarefas = await db.tarefas.find({**filtro, "prazo": com_prazo}).sort(
+        [("prazo", 1), ("evento_id", 1), ("id_interno", 1)]
+    ).to_list(length=limit)
+    # Completa a página com as sem prazo (não entram quando há `prazo_ate`)
+    if not prazo_ate and len(tarefas) < limit:
+        tarefas += await db.tarefas.find({**filtro, "prazo": None}).sort(
+            [("evento_id", 1), ("id_interno", 1)]
+        ).to_list(length=limit - len(tarefas))
+
+    # Títulos dos eventos envolvidos numa consulta só
+    evento_ids = list({t["evento_id"] for t in tarefas})
+    titulos = {
+        e["_id"]: e.get("titulo")
+        async for e in db.eventos.find({"_id": {"$in": evento_ids}}, {"titulo": 1})
+    }
+    return [
+        {**tarefa_publica(t), "evento_titulo": titulos.get(t["evento_id"])}
+        for t in tarefas
+    ]
 
     
 @router.post("/{evento_titulo}/sponsors", response_model=SimpleMessageResponse)
@@ -275,7 +666,7 @@ async def add_sponsor_to_event(
         raise HTTPException(status_code=403, detail="Permissão insuficiente.")
 
     # Encontra o evento pelo título
-    evento = await db.eventos.find_one({"titulo": {"$regex": f"^{evento_titulo}$", "$options": "i"}})
+    evento = await db.eventos.find_one(evento_query(evento_titulo), {"_id": 1})
     if not evento:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
 
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.security import get_current_user, principal_cache
+from app.hashing import hash_executor
+from app.database import engine, mongo_pool_stats
+from app.ledger import report_cache
+from app.analytics import analytics_cache
+from app.member_search import search_cache
+from app.models.sql_models import Usuario, CargoEnum
+
+router = APIRouter(prefix="/internal", tags=["Diagnóstico"])
+
+def require_presidente(current_user: Usuario = Depends(get_current_user)) -> Usuario:
+    if current_user.cargo != CargoEnum.Presidente:
+        raise HTTPException(status_code=403, detail="Acesso restrito.")
+    return current_user
+
+@router.get("/cache")
+async def cache_stats(current_user: Usuario = Depends(require_presidente)):
+    """Contadores de acerto/erro dos caches em memória deste processo."""
+    return {
+        "principal": principal_cache.stats(),
+        "relatorios": report_cache.stats(),
+        "analises": analytics_cache.stats(),
+        "busca_membros": search_cache.stats(),
+    }
+
+@router.get("/hashing")
+async def hashing_stats(current_user: Usuario = Depends(require_presidente)):
+    """Ocupação do pool de bcrypt (em andamento, na fila e rejeitadas)."""
+    return hash_executor.stats()
+
+
+@router.get("/pools")
+async def pool_stats(current_user: Usuario = Depends(require_presidente)):
+    """Conexões em uso, ociosas, overflow e tempo de espera dos pools MySQL e MongoDB."""
+    return {
+        "mysql": engine.pool.stats(),
+        "mongo": mongo_pool_stats.stats(),
+    }
+
+@router.get("/indexes")
+async def mongo_index_report(request: Request, current_user: Usuario = Depends(require_presidente)):
+    """Resultado da última reconciliação dos índices do MongoDB (na inicialização)."""
+    return getattr(request.app.state, "mongo_indexes", None) or {}
\ No newline at end of file
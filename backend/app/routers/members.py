@@ -1,12 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 
 from app.database import get_db
 from app.models.sql_models import Usuario, CargoEnum
-from app.models.schemas import UsuarioCreate, UsuarioResponse, UsuarioUpdate
-from app.security import get_current_user, get_password_hash
+from app.models.schemas import (
+    UsuarioCreate, UsuarioResponse, UsuarioUpdate,
+    MembroBulkCreate, MembroImportResponse, MembroBuscaResultado
+)
+from app.config import settings
+from app.hashing import ExecutorSaturated
+from app.onboarding import cadastrar_membros, ler_csv, LoteInvalido
+from app.member_search import buscar_membros, invalidar_busca
+from app.security import (
+    get_current_user,
+    get_password_hash_async,
+    invalidate_principal,
+    bump_token_version,
+    sync_token_version,
+    token_versions,
+)
 
 router = APIRouter(prefix="/membros", tags=["Gestão de Acesso e Membros"])
 
@@ -21,7 +36,7 @@ async def create_member(
     if current_user.cargo != CargoEnum.Presidente:
         raise HTTPException(status_code=403, detail="Apenas o Presidente pode cadastrar membros.")
     
-    hashed_password = get_password_hash(member.senha)
+    hashed_password = await get_password_hash_async(member.senha)
     
     # Regra 2: O novo membro nasce AUTOMATICAMENTE no CA do Presidente logado
     new_user = Usuario(
@@ -44,9 +59,66 @@ async def create_member(
         # Log do erro real no terminal para você debugar se precisar
         print(f"Erro ao criar membro: {e}")
         raise HTTPException(status_code=400, detail="Erro ao criar membro. Verifique se Email ou CPF já existem.")
-    
+
+    invalidate_principal(new_user.email)
+    invalidar_busca(new_user.centro_academico_id)
     return new_user
 
+# --- CADASTRO EM LOTE ---
+async def _cadastrar_lote(db: AsyncSession, current_user: Usuario, linhas: list, parcial: bool) -> MembroImportResponse:
+    if current_user.cargo != CargoEnum.Presidente:
+        raise HTTPException(status_code=403, detail="Apenas o Presidente pode cadastrar membros.")
+    if len(linhas) > settings.ONBOARDING_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"Máximo de {settings.ONBOARDING_MAX_ROWS} membros por lote.")
+
+    try:
+        resposta = await cadastrar_membros(db, current_user.centro_academico_id, linhas, parcial)
+    except LoteInvalido as e:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": "Nenhum membro foi cadastrado: corrija as linhas com erro ou use parcial=true.",
+                "resultados": [r.model_dump() for r in e.resultados]
+            }
+        )
+    except ExecutorSaturated:
+        raise HTTPException(
+            status_code=503,
+            detail="Outro cadastro em lote está em andamento. Tente novamente em instantes.",
+            headers={"Retry-After": "5"}
+        )
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Email ou CPF cadastrado por outra operação durante o lote. Envie novamente.")
+
+    invalidate_principal(*(r.email for r in resposta.resultados if r.status == "criado"))
+    if resposta.criados:
+        invalidar_busca(current_user.centro_academico_id)
+    return resposta
+
+@router.post("/bulk", response_model=MembroImportResponse, status_code=status.HTTP_201_CREATED)
+async def bulk_create_members(
+    payload: MembroBulkCreate,
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Cadastra vários membros no CA do Presidente, com o resultado de cada linha."""
+    linhas = list(enumerate(payload.membros, start=1))
+    return await _cadastrar_lote(db, current_user, linhas, payload.parcial)
+
+@router.post("/import", response_model=MembroImportResponse, status_code=status.HTTP_201_CREATED)
+async def import_members_csv(
+    arquivo: UploadFile = File(...),
+    parcial: bool = Form(False),
+    current_user: Usuario = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Importa um CSV com nome, email, senha, cpf e, opcionalmente, telefone, cargo e departamento_id."""
+    try:
+        linhas = ler_csv((await arquivo.read()).decode("utf-8-sig"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await _cadastrar_lote(db, current_user, linhas, parcial)
+
 # --- LISTAR MEMBROS ---
 # Substitua o list_members por isso TEMPORARIAMENTE para testar
 @router.get("/", response_model=list[UsuarioResponse])
@@ -65,6 +137,17 @@ async def list_members(
     print(f"Encontrados: {len(membros)} membros.")
     return membros
 
+# --- BUSCAR MEMBROS ---
+@router.get("/search", response_model=list[MembroBuscaResultado])
+async def search_members(
+    q: str = Query(..., min_length=1, max_length=100, description="Início do nome, email ou CPF"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: Usuario = Depends(get_current_user)
+):
+    """Busca por prefixo (sem acentos e sem diferenciar maiúsculas) nos membros do CA."""
+    return await buscar_membros(db, current_user.centro_academico_id, q, limit)
+
 # --- ATUALIZAR MEMBRO ---
 @router.put("/{member_id}", response_model=UsuarioResponse)
 async def update_member(
@@ -87,15 +170,22 @@ async def update_member(
     if db_user.centro_academico_id != current_user.centro_academico_id:
         raise HTTPException(status_code=403, detail="Você não pode alterar membros de outro CA.")
 
+    email_anterior = db_user.email
+    ca_anterior = db_user.centro_academico_id
+
     # Atualiza dados
     update_data = member_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         if key == "senha":
             if value: # Só atualiza senha se vier alguma coisa
-                setattr(db_user, "senha_hash", get_password_hash(value))
+                setattr(db_user, "senha_hash", await get_password_hash_async(value))
         else:
             setattr(db_user, key, value)
 
+    # Mudanças que alteram permissões ou credenciais revogam os tokens emitidos
+    if update_data.keys() & {"senha", "email", "cargo", "status", "departamento_id", "centro_academico_id"}:
+        bump_token_version(db_user)
+
     try:
         await db.commit()
         await db.refresh(db_user)
@@ -103,6 +193,9 @@ async def update_member(
         await db.rollback()
         raise HTTPException(status_code=400, detail=f"Erro ao atualizar: {str(e)}")
 
+    invalidate_principal(email_anterior, db_user.email)
+    invalidar_busca(ca_anterior, db_user.centro_academico_id)
+    sync_token_version(db_user)
     return db_user
 
 # --- DELETAR MEMBRO ---
@@ -136,5 +229,8 @@ async def delete_member(
     # 5. Deleta
     await db.delete(member_to_delete)
     await db.commit()
+    invalidate_principal(member_to_delete.email)
+    invalidar_busca(member_to_delete.centro_academico_id)
+    token_versions.forget(member_to_delete.id)
     
     return None
\ No newline at end of file
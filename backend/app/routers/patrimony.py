@@ -5,7 +5,9 @@ from app.database import get_mongo_db
 from app.models.schemas import PatrimonioCreate, PatrimonioUpdate, PatrimonioResponse, HistoricoItem
 from app.security import get_current_user
 from app.models.sql_models import Usuario, CargoEnum
+from app.normalization import normalize_key
 from bson import ObjectId # <--- Importante para buscar por ID
+from pymongo.errors import DuplicateKeyError
 
 # 👇 1. Prefixo ajustado para Português para bater com o Angular
 router = APIRouter(prefix="/patrimonio", tags=["Gestão de Patrimônio"])
@@ -23,12 +25,14 @@ async def create_patrimony_item(
     if current_user.cargo not in [CargoEnum.Presidente, CargoEnum.Coordenador]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acesso negado.")
 
-    # Verifica duplicidade
-    existing_item = await db.patrimonio.find_one({"nome": {"$regex": f"^{item.nome}$", "$options": "i"}})
+    # Verifica duplicidade (chave normalizada, com índice único)
+    nome_key = normalize_key(item.nome)
+    existing_item = await db.patrimonio.find_one({"nome_key": nome_key}, {"_id": 1})
     if existing_item:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Item já existe.")
 
     item_dict = item.model_dump()
+    item_dict["nome_key"] = nome_key
     
     # CONVERSÃO DE DATA BLINDADA (Garante que salva como datetime no Mongo)
     if item_dict.get("data_aquisicao"):
@@ -45,7 +49,10 @@ async def create_patrimony_item(
     }]
 
     # Salva no Banco
-    result = await db.patrimonio.insert_one(item_dict)
+    try:
+        result = await db.patrimonio.insert_one(item_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Item já existe.")
     
     # Busca o item salvo
     created_item = await db.patrimonio.find_one({"_id": result.inserted_id})
@@ -119,7 +126,8 @@ async def update_patrimony_item(
     # Verificação de nome duplicado (se o nome mudou)
     if "nome" in update_dict and update_dict["nome"] != original_item["nome"]:
         novo_nome = update_dict["nome"]
-        conflict_item = await db.patrimonio.find_one({"nome": {"$regex": f"^{novo_nome}$", "$options": "i"}})
+        update_dict["nome_key"] = normalize_key(novo_nome)
+        conflict_item = await db.patrimonio.find_one({"nome_key": update_dict["nome_key"]}, {"_id": 1})
         # Garante que não é o próprio item
         if conflict_item and str(conflict_item["_id"]) != item_id:
              raise HTTPException(
@@ -151,7 +159,7 @@ async def update_patrimony_item(
         update_dict['data_aquisicao'] = datetime.combine(update_dict['data_aquisicao'], datetime.min.time())
 
     # Histórico
-    detalhes_historico = f"Campos atualizados: {', '.join(update_dict.keys())}"
+    detalhes_historico = f"Campos atualizados: {', '.join(k for k in update_dict if k != 'nome_key')}"
     historico_entry = {
         "timestamp": datetime.now(timezone.utc),
         "usuario_id": current_user.id,
@@ -160,13 +168,16 @@ async def update_patrimony_item(
     }
 
     # Atualiza no Banco
-    await db.patrimonio.update_one(
-        {"_id": ObjectId(item_id)},
-        {
-            "$set": update_dict,
-            "$push": {"historico": historico_entry}
-        }
-    )
+    try:
+        await db.patrimonio.update_one(
+            {"_id": ObjectId(item_id)},
+            {
+                "$set": update_dict,
+                "$push": {"historico": historico_entry}
+            }
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Já existe outro item com este nome.")
 
     updated_item = await db.patrimonio.find_one({"_id": ObjectId(item_id)})
     updated_item["id"] = str(updated_item["_id"])
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy import and_, or_
 from app.database import get_db
+from app.dependencies import get_current_centro_academico_id
 from app.models.sql_models import Usuario # Seu modelo do SQLAlchemy
+from app.models.enums import CargoEnum, StatusEnum
+from app.security import invalidate_principal, bump_token_version, sync_token_version, token_versions
+from app.member_search import invalidar_busca
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
+import base64
+import json
 
 router = APIRouter(prefix="/users", tags=["Gestão de Usuários"])
 
@@ -19,6 +26,10 @@ class UserResponse(BaseModel):
     class Config:
         orm_mode = True # Permite ler direto do objeto do Banco SQL
 
+class UserPage(BaseModel):
+    items: List[UserResponse]
+    next_cursor: Optional[str] = None
+
 class UserUpdate(BaseModel):
     nome: Optional[str] = None
     email: Optional[str] = None
@@ -27,12 +38,82 @@ class UserUpdate(BaseModel):
 
 # --- Rotas ---
 
-@router.get("/", response_model=List[UserResponse])
-async def list_users(db: AsyncSession = Depends(get_db)):
-    # Busca todos os usuários no banco SQL
-    result = await db.execute(select(Usuario))
-    users = result.scalars().all()
-    return users
+# Só as colunas do UserResponse: linhas leves, sem senha_hash nem objetos ORM
+USER_COLUMNS = (Usuario.id, Usuario.nome, Usuario.email, Usuario.cargo, Usuario.departamento_id)
+
+# Tamanho padrão da página no modo cursor
+USER_PAGE_SIZE = 500
+
+# Cursor da paginação: (nome, id) do último usuário visto, em base64 url-safe
+def encode_user_cursor(nome: str, user_id: int) -> str:
+    raw = json.dumps([nome, user_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_user_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        nome, user_id = json.loads(base64.urlsafe_b64decode(padded))
+        return str(nome), int(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido.")
+
+@router.get("/", response_model=Union[UserPage, List[UserResponse]])
+async def list_users(
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    cargo: Optional[CargoEnum] = None,
+    status: Optional[StatusEnum] = None,
+    departamento_id: Optional[int] = None,
+    centro_academico_id: int = Depends(get_current_centro_academico_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Usuários do CA do usuário logado, em ordem alfabética.
+
+    - Sem `cursor`: lista simples com todos os usuários (como antes), ou só
+      os primeiros `limit` se ele for informado.
+    - Com `cursor` (vazio na primeira página): paginação por keyset sobre o
+      índice (centro_academico_id, nome), `limit` (padrão 500) por página;
+      retorna `items` e `next_cursor`.
+    """
+    query = (
+        select(*USER_COLUMNS)
+        .where(Usuario.centro_academico_id == centro_academico_id)
+        .order_by(Usuario.nome, Usuario.id)
+    )
+    if cargo is not None:
+        query = query.where(Usuario.cargo == cargo)
+    if status is not None:
+        query = query.where(Usuario.status == status)
+    if departamento_id is not None:
+        query = query.where(Usuario.departamento_id == departamento_id)
+
+    if cursor:
+        ultimo_nome, ultimo_id = decode_user_cursor(cursor)
+        query = query.where(or_(
+            Usuario.nome > ultimo_nome,
+            and_(Usuario.nome == ultimo_nome, Usuario.id > ultimo_id)
+        ))
+
+    if cursor is None:
+        if limit is not None:
+            query = query.limit(limit)
+    else:
+        limit = limit or USER_PAGE_SIZE
+        query = query.limit(limit + 1)
+
+    result = await db.execute(query)
+    users = [
+        UserResponse(id=r.id, nome=r.nome, email=r.email, cargo=r.cargo.value, departamento_id=r.departamento_id)
+        for r in result
+    ]
+    if cursor is None:
+        return users
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_user_cursor(users[-1].nome, users[-1].id)
+    return UserPage(items=users, next_cursor=next_cursor)
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
@@ -56,13 +137,21 @@ async def update_user(
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
 
+    email_anterior = user.email
+
     # Atualiza apenas os campos enviados
     update_data_dict = user_data.dict(exclude_unset=True)
     for key, value in update_data_dict.items():
         setattr(user, key, value)
 
+    if update_data_dict.keys() & {"email", "cargo"}:
+        bump_token_version(user)
+
     await db.commit()
     await db.refresh(user)
+    invalidate_principal(email_anterior, user.email)
+    invalidar_busca(user.centro_academico_id)
+    sync_token_version(user)
     return user
 
 @router.delete("/{user_id}", status_code=204)
@@ -75,4 +164,7 @@ async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(user)
     await db.commit()
+    invalidate_principal(user.email)
+    invalidar_busca(user.centro_academico_id)
+    token_versions.forget(user.id)
     return
\ No newline at end of file
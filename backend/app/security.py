@@ -1,25 +1,67 @@
 # app/security.py
+import asyncio
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Dict
+from pydantic import BaseModel, ConfigDict
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from app.database import get_db
-from app.models.sql_models import Usuario, StatusEnum
+from app.database import get_db, AsyncSessionLocal
+from app.models.sql_models import Usuario, StatusEnum, CargoEnum
 from app.config import settings
+from app.cache import TTLCache
+from app.hashing import (
+    pwd_context,
+    hash_executor,
+    ExecutorSaturated,
+    hash_password_sync,
+    verify_password_sync,
+)
 from sqlalchemy import select
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Cache de usuários autenticados, indexado pelo "sub" (email) do token.
+# Evita o SELECT em `usuarios` a cada requisição autenticada.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE if settings.PRINCIPAL_CACHE_TTL_SECONDS > 0 else 0,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+def invalidate_principal(*emails: Optional[str]) -> None:
+    """Remove do cache os usuários informados (chamar após alterar/excluir membros)."""
+    for email in emails:
+        if email:
+            principal_cache.pop(email)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_password_sync(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hash_password_sync(password)
+
+# Versões assíncronas: usar dentro das rotas para não bloquear o event loop
+def _hash_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor ocupado. Tente novamente em instantes.",
+        headers={"Retry-After": "1"},
+    )
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await hash_executor.run(verify_password_sync, plain_password, hashed_password)
+    except ExecutorSaturated:
+        raise _hash_pool_busy()
+
+async def get_password_hash_async(password: str) -> str:
+    try:
+        return await hash_executor.run(hash_password_sync, password)
+    except ExecutorSaturated:
+        raise _hash_pool_busy()
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -35,38 +77,172 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     )
     return encoded_jwt
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db)
-) -> Usuario:
-    credentials_exception = HTTPException(
+def build_token_claims(user: Usuario) -> dict:
+    """Monta o payload do token.
+
+    No modo claims (`JWT_CLAIMS_MODE`), cargo, CA, departamento e a versão do
+    token vão assinados no JWT, permitindo autenticar sem consultar o banco.
+    """
+    claims = {"sub": user.email}
+    if settings.JWT_CLAIMS_MODE:
+        claims.update({
+            "uid": user.id,
+            "nome": user.nome,
+            "cargo": user.cargo.value if user.cargo else None,
+            "ca": user.centro_academico_id,
+            "dep": user.departamento_id,
+            "ver": user.token_version or 0,
+        })
+    return claims
+
+# --- VERSÃO DOS TOKENS (revogação no modo claims) ---
+class TokenVersionTable:
+    """Tabela em memória `usuario_id -> token_version`.
+
+    É recarregada do banco no máximo a cada `TOKEN_VERSION_REFRESH_SECONDS`
+    (uma consulta de duas colunas), nunca por requisição. Alterações feitas
+    neste processo são aplicadas na hora via `set`/`forget`.
+    """
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    def _is_stale(self, max_age: float) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > max_age
+
+    async def refresh(self, max_age: Optional[float] = None) -> None:
+        max_age = self.refresh_seconds if max_age is None else max_age
+        async with self._lock:
+            if not self._is_stale(max_age):
+                return
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(select(Usuario.id, Usuario.token_version))
+                self._versions = {row.id: row.token_version or 0 for row in result}
+            self._loaded_at = time.monotonic()
+
+    async def is_valid(self, user_id: int, version: int) -> bool:
+        if self._is_stale(self.refresh_seconds):
+            await self.refresh()
+        current = self._versions.get(user_id)
+        if current is None:
+            # Usuário criado em outro processo depois da última carga:
+            # força uma recarga (limitada a uma por segundo) antes de recusar.
+            await self.refresh(max_age=1)
+            current = self._versions.get(user_id)
+        return current is not None and current == version
+
+    def set(self, user_id: int, version: int) -> None:
+        self._versions[user_id] = version or 0
+
+    def forget(self, user_id: int) -> None:
+        self._versions.pop(user_id, None)
+
+
+token_versions = TokenVersionTable(settings.TOKEN_VERSION_REFRESH_SECONDS)
+
+def bump_token_version(user: Usuario) -> None:
+    """Invalida os tokens já emitidos para `user`. Chamar antes do commit."""
+    user.token_version = (user.token_version or 0) + 1
+
+def sync_token_version(user: Usuario) -> None:
+    """Publica a versão atual de `user` na tabela em memória. Chamar após o commit."""
+    token_versions.set(user.id, user.token_version)
+
+# --- DEPENDÊNCIAS DE AUTENTICAÇÃO ---
+class Principal(BaseModel):
+    """Identidade mínima do usuário autenticado, montada a partir do token."""
+    id: int
+    email: str
+    nome: Optional[str] = None
+    cargo: CargoEnum
+    centro_academico_id: Optional[int] = None
+    departamento_id: Optional[int] = None
+    token_version: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(
             token, 
             settings.SECRET_KEY, 
             algorithms=[settings.ALGORITHM]
         )
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
-    
-    result = await db.execute(
-        select(Usuario)
-        .where(Usuario.email == email)
-        .options(selectinload(Usuario.departamento))
-    )
-    user = result.scalars().first()
-    
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+async def _load_user(payload: dict, db: AsyncSession) -> Usuario:
+    email: str = payload["sub"]
+    user = principal_cache.get(email)
     if user is None:
-        raise credentials_exception
+        result = await db.execute(
+            select(Usuario)
+            .where(Usuario.email == email)
+            .options(selectinload(Usuario.departamento))
+        )
+        user = result.scalars().first()
+
+        if user is None:
+            raise _credentials_exception()
+
+        # Desanexa da sessão antes de cachear: um rollback na requisição
+        # expiraria os atributos e o objeto ficaria inutilizável para as próximas.
+        if user.departamento is not None:
+            db.expunge(user.departamento)
+        db.expunge(user)
+        principal_cache.set(email, user)
+
+    # Token emitido no modo claims: respeita a revogação por versão
+    if "ver" in payload and payload["ver"] != (user.token_version or 0):
+        raise _credentials_exception()
     return user
 
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Usuario:
+    return await _load_user(_decode_token(token), db)
+
+async def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """Autenticação leve para rotas somente leitura.
+
+    Com um token do modo claims não há nenhuma consulta SQL: a identidade vem
+    do próprio JWT e a revogação é conferida na tabela de versões em memória.
+    Tokens antigos (só com `sub`) caem no caminho normal de `get_current_user`.
+    """
+    payload = _decode_token(token)
+    if "uid" in payload and "ver" in payload and payload.get("cargo"):
+        if not await token_versions.is_valid(payload["uid"], payload["ver"]):
+            raise _credentials_exception()
+        return Principal(
+            id=payload["uid"],
+            email=payload["sub"],
+            nome=payload.get("nome"),
+            cargo=payload["cargo"],
+            centro_academico_id=payload.get("ca"),
+            departamento_id=payload.get("dep"),
+            token_version=payload["ver"],
+        )
+
+    user = await _load_user(payload, db)
+    return Principal.model_validate(user)
+
 async def get_current_active_user(
     current_user: Usuario = Depends(get_current_user),
 ) -> Usuario:
@@ -0,0 +1,132 @@
+"""Benchmark do livro-caixa: lançamentos simultâneos no mesmo CA.
+
+Roda direto contra o MySQL configurado no .env (sem subir a API), a partir
+da pasta backend:
+
+    python benchmarks/ledger_concurrency.py --ca 1 --usuario 1
+
+Para cada modo ("saldo" e "append_only") `--concurrency` tarefas gravam
+lançamentos no mesmo CA durante `--duration` segundos, cada uma na sua
+sessão: INSERT em `transacoes` + `aplicar_lancamentos` + commit. No modo
+"saldo" todas disputam o lock da linha do CA; no "append_only" não.
+
+ATENÇÃO: insere lançamentos de verdade. Use um banco de testes. Os
+lançamentos gravados são removidos no final e o saldo/totais do CA são
+restaurados, e as fotografias criadas são apagadas (use --manter para não limpar).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+# Rodado como script, o pacote `app` (pasta backend) não está no path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, select, update
+
+from app.database import AsyncSessionLocal, engine
+from app import ledger
+from app.models.sql_models import CentroAcademico, SaldoSnapshot, TipoTransacao, Transacao
+
+DESCRICAO = "benchmark ledger_concurrency"
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def poster(args, modo, stop, latencias, erros):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(Transacao(
+                    descricao=DESCRICAO,
+                    valor=Decimal("1.00"),
+                    tipo=TipoTransacao.Receita,
+                    usuario_id=args.usuario,
+                    centro_academico_id=args.ca,
+                ))
+                await db.flush()
+                await ledger.aplicar_lancamentos(
+                    db, args.ca, receitas=Decimal("1.00"), despesas=Decimal("0"), quantidade=1, modo=modo
+                )
+                await db.commit()
+            latencias.append(time.perf_counter() - start)
+        except Exception as e:
+            erros[type(e).__name__] = erros.get(type(e).__name__, 0) + 1
+
+
+async def rodada(args, modo):
+    stop = asyncio.Event()
+    latencias, erros = [], {}
+    tasks = [asyncio.create_task(poster(args, modo, stop, latencias, erros)) for _ in range(args.concurrency)]
+    started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"{modo:<12} lançamentos={len(latencias):<6} "
+        f"por s={len(latencias) / elapsed:8.1f}  "
+        f"p50={percentile(latencias, 50) * 1000:7.1f} ms  "
+        f"p99={percentile(latencias, 99) * 1000:7.1f} ms  "
+        f"média={(statistics.mean(latencias) if latencias else 0) * 1000:7.1f} ms  "
+        f"erros={erros or '-'}"
+    )
+
+
+async def run(args):
+    async with AsyncSessionLocal() as db:
+        saldo_inicial = (await db.execute(
+            select(CentroAcademico.saldo).where(CentroAcademico.id == args.ca)
+        )).scalar()
+        if saldo_inicial is None:
+            raise SystemExit(f"CA {args.ca} não encontrado.")
+        ultimo_snapshot = (await db.execute(select(func.coalesce(func.max(SaldoSnapshot.id), 0)))).scalar()
+
+    try:
+        for modo in (ledger.MODO_SALDO, ledger.MODO_APPEND_ONLY):
+            if modo == ledger.MODO_APPEND_ONLY:
+                # Como no lifespan: fotografia inicial antes do primeiro lançamento
+                await ledger.garantir_snapshot(args.ca)
+            await rodada(args, modo)
+        # Confere se o saldo derivado fecha com o do modo "saldo" (cada modo somou o seu)
+        async with AsyncSessionLocal() as db:
+            derivado = await ledger.saldo_atual(db, args.ca, modo=ledger.MODO_APPEND_ONLY)
+        print(f"saldo derivado (append_only): {derivado['saldo']}")
+    finally:
+        if not args.manter:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(Transacao).where(
+                    Transacao.centro_academico_id == args.ca, Transacao.descricao == DESCRICAO
+                ))
+                await db.execute(delete(SaldoSnapshot).where(
+                    SaldoSnapshot.centro_academico_id == args.ca, SaldoSnapshot.id > ultimo_snapshot
+                ))
+                await db.execute(update(CentroAcademico).where(CentroAcademico.id == args.ca).values(saldo=saldo_inicial))
+                await db.commit()
+                await ledger.recalcular_totais(db, args.ca)
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ca", type=int, required=True, help="centro acadêmico dos lançamentos")
+    parser.add_argument("--usuario", type=int, required=True, help="usuário autor dos lançamentos")
+    parser.add_argument("--concurrency", type=int, default=16, help="lançamentos em paralelo")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por modo")
+    parser.add_argument("--manter", action="store_true", help="não remove os lançamentos do benchmark")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
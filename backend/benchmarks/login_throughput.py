@@ -0,0 +1,115 @@
+"""Benchmark de login: latência de rotas não relacionadas durante rajadas de login.
+
+Com o servidor rodando (uvicorn app.main:app), execute a partir da pasta backend:
+
+    python benchmarks/login_throughput.py --username admin@calove.br --password 123456
+
+O script mede a latência de uma rota "sonda" (por padrão `/` e
+`/financeiro/balance`) primeiro em repouso e depois enquanto `--concurrency`
+clientes fazem login sem parar. Com o bcrypt no event loop, o p99 da sonda
+acompanha o custo do hash; com o pool dedicado ele deve ficar estável.
+Requer `httpx` (pip install httpx).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - dependência só do benchmark
+    raise SystemExit("Instale o httpx para rodar o benchmark: pip install httpx")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summary(label, samples):
+    if not samples:
+        return f"{label:<28} sem amostras"
+    return (
+        f"{label:<28} n={len(samples):<6} "
+        f"p50={percentile(samples, 50) * 1000:7.1f} ms  "
+        f"p99={percentile(samples, 99) * 1000:7.1f} ms  "
+        f"média={statistics.mean(samples) * 1000:7.1f} ms"
+    )
+
+
+async def login(client, username, password):
+    response = await client.post("/auth/login", data={"username": username, "password": password})
+    return response
+
+
+async def probe_loop(client, paths, headers, stop, samples):
+    while not stop.is_set():
+        for path in paths:
+            start = time.perf_counter()
+            await client.get(path, headers=headers)
+            samples.append(time.perf_counter() - start)
+        await asyncio.sleep(0.01)
+
+
+async def login_loop(client, username, password, stop, counters):
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await login(client, username, password)
+        counters["latencias"].append(time.perf_counter() - start)
+        counters[response.status_code] = counters.get(response.status_code, 0) + 1
+
+
+async def run(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        response = await login(client, args.username, args.password)
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        paths = args.probe or ["/", "/financeiro/balance"]
+
+        # 1. Linha de base: só a sonda
+        stop = asyncio.Event()
+        baseline = []
+        task = asyncio.create_task(probe_loop(client, paths, headers, stop, baseline))
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await task
+
+        # 2. Sonda enquanto os logins rodam
+        stop = asyncio.Event()
+        under_load = []
+        counters = {"latencias": []}
+        tasks = [asyncio.create_task(probe_loop(client, paths, headers, stop, under_load))]
+        tasks += [
+            asyncio.create_task(login_loop(client, args.username, args.password, stop, counters))
+            for _ in range(args.concurrency)
+        ]
+        started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    logins = counters.pop("latencias")
+    print(summary("sonda (repouso)", baseline))
+    print(summary("sonda (durante logins)", under_load))
+    print(summary("login", logins))
+    print(f"{'logins/s':<28} {len(logins) / elapsed:.1f}")
+    print(f"{'status dos logins':<28} {dict(sorted(counters.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=16, help="clientes fazendo login em paralelo")
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por fase")
+    parser.add_argument("--probe", action="append", help="rota sonda (pode repetir)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
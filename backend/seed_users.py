@@ -1,4 +1,6 @@
+import argparse
 import asyncio
+import json
 import sys
 import os
 
@@ -149,5 +151,49 @@ async def create_initial_users():
         finally:
             pass
 
+async def create_bulk_users(caminho: str, centro_academico_id: int, parcial: bool):
+    """Modo lote: cadastra os membros de um CSV ou JSON (lista de objetos) de uma vez.
+
+    Mesmo fluxo do POST /membros/bulk: uma consulta IN para email/CPF, hashes
+    em paralelo num pool de processos e um único INSERT em lote.
+    """
+    from app.hashing import BoundedExecutor
+    from app.onboarding import cadastrar_membros, ler_csv, LoteInvalido
+
+    with open(caminho, encoding="utf-8-sig") as f:
+        conteudo = f.read()
+    if caminho.lower().endswith(".json"):
+        linhas = list(enumerate(json.loads(conteudo), start=1))
+    else:
+        linhas = ler_csv(conteudo)
+    print(f"--- Cadastro em lote: {len(linhas)} linhas de {caminho} (CA {centro_academico_id}) ---")
+
+    executor = BoundedExecutor(kind="process", workers=os.cpu_count() or 4, max_queue=len(linhas))
+    async with AsyncSessionLocal() as session:
+        try:
+            resposta = await cadastrar_membros(session, centro_academico_id, linhas, parcial, executor=executor)
+        except LoteInvalido as e:
+            resposta = None
+            print("Nenhum membro cadastrado (use --parcial para gravar só as linhas válidas):")
+            for r in e.resultados:
+                print(f"  linha {r.linha} ({r.email or '-'}): {'; '.join(r.erros)}")
+        finally:
+            executor.shutdown()
+
+    if resposta is not None:
+        for r in resposta.resultados:
+            detalhe = f"id {r.id}" if r.status == "criado" else "; ".join(r.erros)
+            print(f"  linha {r.linha} ({r.email or '-'}): {r.status} - {detalhe}")
+        print(f"SUCESSO: {resposta.criados} criados, {resposta.rejeitados} rejeitados.")
+
 if __name__ == "__main__":
-    asyncio.run(create_initial_users())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Criação de usuários iniciais ou cadastro em lote")
+    parser.add_argument("--bulk", metavar="ARQUIVO", help="CSV ou JSON com os membros a cadastrar")
+    parser.add_argument("--ca", type=int, default=1, help="centro acadêmico dos membros do lote")
+    parser.add_argument("--parcial", action="store_true", help="grava as linhas válidas mesmo havendo erros")
+    args = parser.parse_args()
+
+    if args.bulk:
+        asyncio.run(create_bulk_users(args.bulk, args.ca, args.parcial))
+    else:
+        asyncio.run(create_initial_users())